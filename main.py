@@ -31,6 +31,13 @@ except ImportError:
     RICH_AVAILABLE = False
     console = None
 
+# Optional faster event loop (libuv-based; not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 
 def print_msg(message: str, style: str = None, error: bool = False):
     """Print a message with optional Rich styling."""
@@ -162,7 +169,10 @@ def setup_logging(level: str = "INFO", quiet: bool = False) -> None:
 
 def main():
     """Main entry point wrapper."""
-    asyncio.run(async_main())
+    if UVLOOP_AVAILABLE:
+        uvloop.run(async_main())
+    else:
+        asyncio.run(async_main())
 
 
 async def async_main():
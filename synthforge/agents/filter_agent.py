@@ -8,8 +8,21 @@ Uses azure.ai.agents.AgentsClient with Bing Grounding and MCP tools.
 Agent chooses best tool for classification - NO STATIC MAPPINGS.
 """
 
+import asyncio
+import hashlib
 import json
-from typing import Optional, Any
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+from typing import Optional, Any, Protocol
+
+# Optional: orjson for faster JSON serialization/parsing (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
 
 from azure.identity import DefaultAzureCredential
 from azure.ai.agents import AgentsClient
@@ -23,10 +36,117 @@ from synthforge.models import (
     FilterDecision,
     FilterCategory,
 )
-from synthforge.prompts import get_filter_agent_instructions, get_user_prompt_template, get_response_schema_json
+from synthforge.prompts import (
+    get_filter_agent_instructions,
+    get_prompt_template,
+    get_user_prompt_template,
+    get_response_schema_json,
+)
 from synthforge.agents.tool_setup import create_agent_toolset, get_tool_instructions
 
 
+@lru_cache(maxsize=1)
+def _get_agent_instructions() -> str:
+    """Get the full agent instructions (YAML instructions + tool usage), built once."""
+    return f"{get_filter_agent_instructions()}\n\n{get_tool_instructions()}"
+
+
+@lru_cache(maxsize=1)
+def _get_response_schema() -> str:
+    """Get the filter decisions response schema as prompt JSON, rendered once."""
+    return get_response_schema_json("filter_decisions")
+
+
+@lru_cache(maxsize=1)
+def _get_prompt_parts() -> tuple[str, str]:
+    """
+    Get the user prompt split around the resources placeholder, built once.
+    
+    The response schema is static, so it is rendered into the template on first
+    use. Each call then only concatenates prefix + resources_json + suffix instead
+    of re-loading the template and re-serializing the schema.
+    
+    Returns:
+        (prefix, suffix) surrounding the {resources_json} placeholder
+    """
+    prompt_template = get_user_prompt_template("filter_agent")
+    response_schema = _get_response_schema()
+    
+    prefix, _, suffix = prompt_template.partition("{resources_json}")
+    return (
+        prefix.format(response_schema=response_schema),
+        suffix.format(response_schema=response_schema),
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_foundational_guidance() -> str:
+    """Get the foundational services guidance used with description context, loaded once."""
+    return get_prompt_template(
+        "filter_agent",
+        "foundational_services_guidance",
+        from_iac=False
+    )
+
+
+def _is_unknown_arm_type(arm_resource_type: Optional[str]) -> bool:
+    """Whether an ARM resource type is missing/Unknown (always needs user clarification)."""
+    return (arm_resource_type or "").strip().lower() in ("", "unknown")
+
+
+class DescriptionLike(Protocol):
+    """Description context fields used by the filter prompt (e.g. ArchitectureDescription)."""
+    azure_components: list[str]
+    overview: Optional[str]
+
+
+# Filter Agent tool setup (also part of the response cache key)
+_TOOL_SETUP: dict[str, Any] = {
+    "include_bing": True,
+    "include_mcp": True,
+    "mcp_servers": ["mslearn"],
+}
+_TOP_P = 0.95
+
+# Bump when the cached response format or its interpretation changes
+_RESPONSE_CACHE_VERSION = 1
+
+# In-memory layer of the filter response cache (prompt hash -> parsed agent response).
+# The on-disk layer lives in settings.filter_cache_dir so re-runs also hit.
+_RESPONSE_CACHE: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+_RESPONSE_CACHE_MAX_ENTRIES = 128
+
+# Category string -> enum member (dict lookup instead of FilterCategory(...) + ValueError).
+# Pre-canonicalized for the casings agents emit ("architectural", "ARCHITECTURAL",
+# "Non Architectural", "NON_ARCHITECTURAL", ...) so the common case is one lookup.
+_CATEGORY_MAP: dict[str, FilterCategory] = {
+    variant: category
+    for category in FilterCategory
+    for spelling in (category.value, category.value.replace("_", " "))
+    for variant in (spelling, spelling.upper(), spelling.title(), spelling.capitalize())
+}
+
+# Decision used for resources the agent did not mention (read-only)
+_EMPTY_DECISION: dict[str, Any] = {}
+
+# Shared decoder for locating the JSON object embedded in agent responses
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a compact JSON string, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _json_loads(data: str | bytes) -> Any:
+    """Parse a JSON string or bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class FilterAgent:
     """
     Filter Agent for classifying resources as architectural or non-architectural.
@@ -49,6 +169,9 @@ class FilterAgent:
         self._client: Optional[AgentsClient] = None
         self._agent_id: Optional[str] = None
         self._tool_config = None
+        self._background_tasks: set[asyncio.Task] = set()
+        # Fresh (never used) thread IDs ready for the next run
+        self._thread_pool: asyncio.Queue[str] = asyncio.Queue()
     
     async def __aenter__(self) -> "FilterAgent":
         """Initialize the agent with Bing Grounding and MCP tools."""
@@ -62,44 +185,54 @@ class FilterAgent:
             credential=credential,
         )
         
-        # Get base instructions from YAML
-        base_instructions = get_filter_agent_instructions()
-        
-        # Add tool usage instructions
-        tool_instructions = get_tool_instructions()
-        instructions = f"{base_instructions}\n\n{tool_instructions}"
+        # Base instructions from YAML + tool usage instructions (cached)
+        instructions = _get_agent_instructions()
         
         # Configure tools: Bing Grounding > MS Learn MCP
         # Bing Grounding: Best practices for architectural patterns
         # MS Learn MCP: Official documentation
-        self._tool_config = create_agent_toolset(
-            include_bing=True,
-            include_mcp=True,
-            mcp_servers=["mslearn"],
-        )
+        self._tool_config = create_agent_toolset(**_TOOL_SETUP)
         
-        agent = self._client.create_agent(
-            model=self.settings.model_deployment_name,
-            name="FilterAgent",
-            instructions=instructions,
-            tools=self._tool_config.tools,
-            tool_resources=self._tool_config.tool_resources,
-            temperature=self.settings.model_temperature,
-            top_p=0.95,
+        # Pre-create the first thread alongside the agent - threads do not depend on
+        # the agent, so the first filter call starts without a thread round trip
+        agent, thread = await asyncio.gather(
+            asyncio.to_thread(
+                self._client.create_agent,
+                model=self.settings.model_deployment_name,
+                name="FilterAgent",
+                instructions=instructions,
+                tools=self._tool_config.tools,
+                tool_resources=self._tool_config.tool_resources,
+                temperature=self.settings.model_temperature,
+                top_p=_TOP_P,
+            ),
+            asyncio.to_thread(self._client.threads.create),
         )
         self._agent_id = agent.id
+        self._thread_pool.put_nowait(thread.id)
         
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Cleanup the agent."""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        
+        # Delete pre-created threads that were never used
+        while not self._thread_pool.empty():
+            thread_id = self._thread_pool.get_nowait()
+            try:
+                await asyncio.to_thread(self._client.threads.delete, thread_id)
+            except Exception:
+                pass
+        
         if self._client and self._agent_id:
             try:
-                self._client.delete_agent(self._agent_id)
+                await asyncio.to_thread(self._client.delete_agent, self._agent_id)
             except Exception:
                 pass
     
-    async def filter_resources(self, detection_result: DetectionResult, description_context: Optional[Any] = None) -> FilterResult:
+    async def filter_resources(self, detection_result: DetectionResult, description_context: Optional[DescriptionLike] = None) -> FilterResult:
         """
         Filter detected resources using first-principles reasoning.
         
@@ -118,64 +251,55 @@ class FilterAgent:
         if not self._client or not self._agent_id:
             raise RuntimeError("Agent not initialized. Use async context manager.")
         
-        # Build resource data for analysis
-        resources_json = json.dumps([
-            {
-                "type": icon.type,
-                "name": icon.name,
-                "arm_resource_type": icon.arm_resource_type,
-                "confidence": icon.confidence,
-                "needs_clarification": icon.needs_clarification,
-            }
-            for icon in detection_result.icons
-        ], indent=2)
-        
-        # Include description context if available
-        description_text = ""
-        if description_context:
-            # Load foundational services guidance from YAML
-            from synthforge.prompts import get_prompt_template
-            foundational_guidance = get_prompt_template(
-                "filter_agent",
-                "foundational_services_guidance",
-                from_iac=False
-            )
+        # Inputs whose outcome does not depend on the agent skip the run entirely
+        trivial_result = self._build_trivial_result(detection_result)
+        if trivial_result is not None:
+            return trivial_result
+        
+        # Take a fresh thread (pre-created, or created now) right away so any
+        # creation round trip overlaps with building the prompt
+        thread_task = self._acquire_thread()
+        
+        try:
+            prompt = self._build_prompt(self._build_resources_json(detection_result), description_context)
             
-            description_text = f"\n\n## Architecture Description Context\n\n"
-            description_text += f"The diagram description identified the following Azure components:\n\n"
-            if hasattr(description_context, 'azure_components'):
-                description_text += "**Azure Services:**\n"
-                for comp in description_context.azure_components[:10]:  # Limit to first 10
-                    description_text += f"- {comp}\n"
-            if hasattr(description_context, 'overview'):
-                description_text += f"\n**Solution Overview:** {description_context.overview}\n"
-            description_text += "\nUse this context to:\n"
-            description_text += foundational_guidance
-            description_text += "\n2. **Enrich detections** - Add missing context or validate service identification\n"
-            description_text += "3. **Determine service purpose** - Understand if services are core infrastructure vs supporting\n"
-        
-        # Load user prompt template and response schema from YAML configuration
-        prompt_template = get_user_prompt_template("filter_agent")
-        response_schema = get_response_schema_json("filter_decisions")
-        
-        # Build prompt from template with placeholders
-        prompt = prompt_template.format(
-            resources_json=resources_json,
-            response_schema=response_schema,
-        ) + description_text
-        
-        # Create thread and send message
-        thread = self._client.threads.create()
-        
-        self._client.messages.create(
-            thread_id=thread.id,
+            # Identical prompts (same resources + description context) get identical
+            # classifications - reuse the cached decisions and skip the agent run
+            cache_key = self._get_cache_key(prompt) if self.settings.filter_cache_enabled else None
+            cached_data = await self._load_cached_response(cache_key) if cache_key else None
+        except BaseException:
+            self._release_unused_thread(thread_task)
+            raise
+        
+        if cached_data is not None:
+            # The thread was never used - keep it for the next run
+            self._release_unused_thread(thread_task)
+            return self._build_filter_result(cached_data, detection_result)
+        
+        response_text = await self._run_agent(await thread_task, prompt)
+        
+        data = self._extract_response_data(response_text)
+        if cache_key:
+            await self._store_cached_response(cache_key, data)
+        
+        return self._build_filter_result(data, detection_result)
+    
+    async def _run_agent(self, thread_id: str, prompt: str) -> str:
+        """Post the prompt on a fresh thread, run the agent and return its response text."""
+        # Send message on the thread.
+        # The AgentsClient is synchronous; run each blocking call in a worker thread
+        # so the event loop stays free for concurrent filter calls.
+        await asyncio.to_thread(
+            self._client.messages.create,
+            thread_id=thread_id,
             role="user",
             content=prompt,
         )
         
         # Run the agent with toolset (allows agent to use MCP or Bing as needed)
-        run = self._client.runs.create_and_process(
-            thread_id=thread.id,
+        run = await asyncio.to_thread(
+            self._client.runs.create_and_process,
+            thread_id=thread_id,
             agent_id=self._agent_id,
             toolset=self._tool_config.toolset if self._tool_config else None,
         )
@@ -184,83 +308,308 @@ class FilterAgent:
             raise RuntimeError(f"Filter analysis failed: {run.last_error}")
         
         # Get the response
-        last_msg = self._client.messages.get_last_message_text_by_role(
-            thread_id=thread.id,
+        last_msg = await asyncio.to_thread(
+            self._client.messages.get_last_message_text_by_role,
+            thread_id=thread_id,
             role=MessageRole.AGENT,
         )
         
         if not last_msg:
             raise RuntimeError("No response from filter agent")
         
-        response_text = last_msg.text.value
+        return last_msg.text.value
+    
+    def _build_trivial_result(self, detection_result: DetectionResult) -> Optional[FilterResult]:
+        """
+        Build the FilterResult without the agent when its decisions cannot matter.
+        
+        - No icons: nothing to classify.
+        - Every icon has an Unknown/missing ARM type: all of them go to
+          needs_clarification regardless of the agent's category.
+        
+        Returns:
+            FilterResult for trivial inputs, None when the agent is needed
+        """
+        icons = detection_result.icons
+        if not icons:
+            return FilterResult(summary="No resources detected")
+        
+        if not all(_is_unknown_arm_type(icon.arm_resource_type) for icon in icons):
+            return None
+        
+        return FilterResult(
+            needs_clarification=list(icons),
+            decisions=[
+                FilterDecision(
+                    resource_type=icon.type,
+                    category=FilterCategory.NEEDS_CLARIFICATION,
+                    reasoning="ARM resource type is unknown - requires user clarification",
+                    confidence=0.0,
+                )
+                for icon in icons
+            ],
+            summary=f"{len(icons)} resources have unknown ARM types and need clarification",
+        )
+    
+    def _build_resource_entries(self, detection_result: DetectionResult) -> list[dict[str, Any]]:
+        """Build the per-resource data sent to the agent."""
+        return [
+            {
+                "type": icon.type,
+                "name": icon.name,
+                "arm_resource_type": icon.arm_resource_type,
+                "confidence": icon.confidence,
+                "needs_clarification": icon.needs_clarification,
+            }
+            for icon in detection_result.icons
+        ]
+    
+    def _build_resources_json(self, detection_result: DetectionResult) -> str:
+        """Serialize the detected resources for the filter prompt."""
+        # Compact JSON - indentation only adds prompt tokens
+        return _json_dumps(self._build_resource_entries(detection_result))
+    
+    def _build_description_text(self, description_context: Optional[DescriptionLike]) -> str:
+        """Build the description context section of the filter prompt (empty without context)."""
+        if not description_context:
+            return ""
+        
+        # Load foundational services guidance from YAML (cached)
+        foundational_guidance = _get_foundational_guidance()
+        
+        description_parts: list[str] = [
+            "\n\n## Architecture Description Context\n\n",
+            "The diagram description identified the following Azure components:\n\n",
+        ]
+        # DescriptionLike is only a static type - objects missing a field still work
+        azure_components = getattr(description_context, "azure_components", None)
+        if azure_components:
+            description_parts.append("**Azure Services:**\n")
+            # Limit to first 10
+            description_parts.extend(f"- {comp}\n" for comp in islice(azure_components, 10))
+        overview = getattr(description_context, "overview", None)
+        if overview:
+            description_parts.append(f"\n**Solution Overview:** {overview}\n")
+        description_parts.append("\nUse this context to:\n")
+        description_parts.append(foundational_guidance)
+        description_parts.append("\n2. **Enrich detections** - Add missing context or validate service identification\n")
+        description_parts.append("3. **Determine service purpose** - Understand if services are core infrastructure vs supporting\n")
+        return "".join(description_parts)
+    
+    def _build_prompt(self, resources_json: str, description_context: Optional[DescriptionLike]) -> str:
+        """Build the filter prompt from serialized resources and optional description context."""
+        description_text = self._build_description_text(description_context)
+        
+        # Build prompt from the pre-rendered template (schema already filled in).
+        # The static prefix (task, schema, category definitions) is byte-identical
+        # across calls and comes first so provider-side prompt caching can reuse it;
+        # per-call content (resources, description context) goes at the end.
+        prompt_prefix, prompt_suffix = _get_prompt_parts()
+        return "".join((prompt_prefix, resources_json, prompt_suffix, description_text))
+    
+    def _acquire_thread(self) -> "asyncio.Future[str]":
+        """
+        Take a fresh thread for one agent run, returning a future for its ID.
+        
+        Threads are never reused after a run (each run needs an empty conversation),
+        so the pool only holds pre-created, unused threads. Falls back to creating
+        a thread when the pool is empty; the create call is handed to the executor
+        before this returns, so it runs while the caller keeps working.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            thread_id = self._thread_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            return loop.run_in_executor(None, lambda: self._client.threads.create().id)
+        thread_future = loop.create_future()
+        thread_future.set_result(thread_id)
+        return thread_future
+    
+    def _release_unused_thread(self, thread_task: "asyncio.Future[str]") -> None:
+        """Return a thread that was acquired but not used to the pool, in the background."""
+        async def _release_thread() -> None:
+            try:
+                self._thread_pool.put_nowait(await thread_task)
+            except Exception:
+                pass
+        
+        task = asyncio.create_task(_release_thread())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    def _get_cache_key(self, prompt: str) -> str:
+        """
+        Build the response cache key.
+        
+        Covers everything that shapes the agent's answer: the model deployment and
+        sampling settings, the agent instructions (YAML + tool usage), the tool
+        setup, the response schema and the full prompt. Editing any of them - or
+        bumping _RESPONSE_CACHE_VERSION - invalidates earlier entries.
+        """
+        payload = _json_dumps([
+            _RESPONSE_CACHE_VERSION,
+            self.settings.model_deployment_name,
+            self.settings.model_temperature,
+            _TOP_P,
+            _get_agent_instructions(),
+            _TOOL_SETUP,
+            _get_response_schema(),
+            prompt,
+        ]).encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    async def _load_cached_response(self, cache_key: str) -> Optional[dict[str, Any]]:
+        """Look up a parsed agent response in memory, then on disk."""
+        data = _RESPONSE_CACHE.get(cache_key)
+        if data is not None:
+            _RESPONSE_CACHE.move_to_end(cache_key)
+            return data
         
-        return self._parse_response(response_text, detection_result)
+        # File I/O runs in a worker thread to keep the event loop free
+        data = await asyncio.to_thread(self._read_cache_file, cache_key)
+        if data is not None:
+            self._remember_response(cache_key, data)
+        return data
     
-    def _parse_response(self, response_text: str, detection_result: DetectionResult) -> FilterResult:
-        """Parse the agent response into FilterResult."""
+    async def _store_cached_response(self, cache_key: str, data: dict[str, Any]) -> None:
+        """Store a parsed agent response in memory and on disk."""
+        self._remember_response(cache_key, data)
+        await asyncio.to_thread(self._write_cache_file, cache_key, data)
+    
+    def _read_cache_file(self, cache_key: str) -> Optional[dict[str, Any]]:
+        """Read a cached response from settings.filter_cache_dir (None on a miss)."""
+        cache_file = self.settings.filter_cache_dir / f"{cache_key}.json"
         try:
-            # Extract JSON from response
-            json_start = response_text.find('{')
+            data = _json_loads(cache_file.read_bytes())
+        except (OSError, ValueError):
+            # Missing or unreadable/corrupt entry - treat as a miss, it is rewritten after the run
+            return None
+        return data if isinstance(data, dict) else None
+    
+    def _write_cache_file(self, cache_key: str, data: dict[str, Any]) -> None:
+        """Write a cached response to settings.filter_cache_dir."""
+        try:
+            self.settings.filter_cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self.settings.filter_cache_dir / f"{cache_key}.json"
+            cache_file.write_text(_json_dumps(data), encoding="utf-8")
+        except OSError:
+            # Cache is best-effort - never fail the filter stage on a write error
+            pass
+    
+    @staticmethod
+    def _remember_response(cache_key: str, data: dict[str, Any]) -> None:
+        """Add an entry to the in-memory cache, evicting the least recently used."""
+        _RESPONSE_CACHE[cache_key] = data
+        _RESPONSE_CACHE.move_to_end(cache_key)
+        while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX_ENTRIES:
+            _RESPONSE_CACHE.popitem(last=False)
+    
+    def _extract_response_data(self, response_text: str, required_key: str = "decisions") -> dict[str, Any]:
+        """
+        Extract the JSON payload from the agent response.
+        
+        Decodes in place starting at each '{' with raw_decode, which stops at the
+        matching closing brace - one pass over the payload, no rfind scan and no
+        substring copy. Braces in surrounding prose are skipped until an object
+        containing `required_key` decodes; otherwise the first object is returned
+        if it decoded cleanly.
+        """
+        first_data: Optional[dict[str, Any]] = None
+        json_start: int = response_text.find('{')
+        
+        # Fast path: the response is a single JSON object (optionally fenced)
+        if ORJSON_AVAILABLE and json_start >= 0:
             json_end = response_text.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                data = json.loads(json_str)
+            try:
+                data = orjson.loads(response_text[json_start:json_end])
+            except orjson.JSONDecodeError:
+                pass
             else:
-                raise ValueError("No JSON found in response")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse filter response: {e}")
+                if isinstance(data, dict) and required_key in data:
+                    return data
         
+        last_error: Optional[json.JSONDecodeError] = None
+        while json_start >= 0:
+            try:
+                data, json_end = _JSON_DECODER.raw_decode(response_text, json_start)
+            except json.JSONDecodeError as e:
+                last_error = e
+                json_start = response_text.find('{', json_start + 1)
+                continue
+            
+            if required_key in data:
+                return data
+            if first_data is None and last_error is None:
+                first_data = data
+            # Skip past this object - its nested objects are not the payload
+            json_start = response_text.find('{', json_end)
+        
+        if first_data is not None:
+            return first_data
+        if last_error is not None:
+            raise ValueError(f"Failed to parse filter response: {last_error}")
+        raise ValueError("No JSON found in response")
+    
+    def _build_filter_result(self, data: dict[str, Any], detection_result: DetectionResult) -> FilterResult:
+        """Categorize detected resources using the agent's decisions."""
         # Build decision lookup
-        decisions_by_type = {}
-        for decision in data.get("decisions", []):
-            decisions_by_type[decision.get("resource_type", "")] = decision
+        decisions_by_type: dict[str, dict[str, Any]] = {
+            decision.get("resource_type", ""): decision
+            for decision in data.get("decisions", [])
+        }
+        
+        # Resolve per-icon inputs up front so the categorization loop only dispatches
+        icons: list[DetectedIcon] = detection_result.icons
+        icon_types: list[str] = [icon.type for icon in icons]
+        icon_decisions: list[dict[str, Any]] = [decisions_by_type.get(icon_type, _EMPTY_DECISION) for icon_type in icon_types]
+        # CRITICAL: Auto-flag resources with Unknown ARM type for clarification
+        # Regardless of agent's category decision, Unknown ARM types need user input
+        unknown_arm_types: list[bool] = [_is_unknown_arm_type(icon.arm_resource_type) for icon in icons]
         
         # Categorize resources
-        architectural = []
-        non_architectural = []
-        network_isolation = []  # NEW: Network patterns become recommendations
-        needs_clarification = []
-        decisions = []
-        
-        for icon in detection_result.icons:
-            decision_data = decisions_by_type.get(icon.type, {})
-            category_str = decision_data.get("category", "architectural").lower().replace(" ", "_")
-            
-            try:
-                category = FilterCategory(category_str)
-            except ValueError:
-                # Default to ARCHITECTURAL to preserve core resources
-                category = FilterCategory.ARCHITECTURAL
+        architectural: list[DetectedIcon] = []
+        non_architectural: list[DetectedIcon] = []
+        network_isolation: list[DetectedIcon] = []  # NEW: Network patterns become recommendations
+        needs_clarification: list[DetectedIcon] = []
+        decisions: list[FilterDecision] = []
+        
+        # Network isolation patterns go to a separate list - they become recommendations
+        buckets: dict[FilterCategory, list[DetectedIcon]] = {
+            FilterCategory.ARCHITECTURAL: architectural,
+            FilterCategory.NON_ARCHITECTURAL: non_architectural,
+            FilterCategory.NETWORK_ISOLATION_PATTERN: network_isolation,
+            FilterCategory.NEEDS_CLARIFICATION: needs_clarification,
+        }
+        append_decision = decisions.append
+        append_clarification = needs_clarification.append
+        
+        for icon, icon_type, decision_data, has_unknown_arm_type in zip(
+            icons, icon_types, icon_decisions, unknown_arm_types
+        ):
+            category_str: str = decision_data.get("category", "architectural")
+            category: Optional[FilterCategory] = _CATEGORY_MAP.get(category_str)
+            if category is None:
+                # Unusual casing/spacing - normalize, then default to ARCHITECTURAL
+                # to preserve core resources
+                category = _CATEGORY_MAP.get(
+                    category_str.strip().lower().replace(" ", "_"),
+                    FilterCategory.ARCHITECTURAL,
+                )
             
-            decision = FilterDecision(
-                resource_type=icon.type,
+            append_decision(FilterDecision(
+                resource_type=icon_type,
                 category=category,
                 reasoning=decision_data.get("reasoning", ""),
                 confidence=decision_data.get("confidence", 0.5),
-            )
-            decisions.append(decision)
-            
-            # CRITICAL: Auto-flag resources with Unknown ARM type for clarification
-            # Regardless of agent's category decision, Unknown ARM types need user input
-            has_unknown_arm_type = (
-                not icon.arm_resource_type or 
-                icon.arm_resource_type.strip() == "" or 
-                icon.arm_resource_type.lower() == "unknown"
-            )
+            ))
             
-            if has_unknown_arm_type or category == FilterCategory.NEEDS_CLARIFICATION:
-                # Flag for clarification if:
-                # 1. ARM type is Unknown/missing (ALWAYS needs clarification)
-                # 2. Agent explicitly categorized as NEEDS_CLARIFICATION
-                needs_clarification.append(icon)
-            elif category == FilterCategory.ARCHITECTURAL:
-                architectural.append(icon)
-            elif category == FilterCategory.NON_ARCHITECTURAL:
-                non_architectural.append(icon)
-            elif category == FilterCategory.NETWORK_ISOLATION_PATTERN:
-                # Network isolation patterns go to a separate list - they become recommendations
-                network_isolation.append(icon)
+            # Flag for clarification if:
+            # 1. ARM type is Unknown/missing (ALWAYS needs clarification)
+            # 2. Agent explicitly categorized as NEEDS_CLARIFICATION
+            if has_unknown_arm_type:
+                append_clarification(icon)
+            else:
+                buckets[category].append(icon)
         
         return FilterResult(
             architectural=architectural,
@@ -10,13 +10,26 @@ Handles user interaction for:
 Uses azure.ai.agents.AgentsClient (Foundry agentic pattern).
 """
 
+import asyncio
+import concurrent.futures
 import json
-from typing import Optional, Callable, Awaitable, List, Any
+import queue
+import re
+import sys
+import threading
+from functools import lru_cache
+from typing import Optional, Callable, Awaitable, Iterable, List, Any
 from enum import Enum
 
 from azure.identity import DefaultAzureCredential
 from azure.ai.agents import AgentsClient
-from azure.ai.agents.models import MessageRole
+from azure.ai.agents.models import (
+    AgentStreamEvent,
+    MessageDeltaChunk,
+    ResponseFormatJsonSchema,
+    ResponseFormatJsonSchemaType,
+    ThreadRun,
+)
 
 from synthforge.config import get_settings
 from synthforge.models import (
@@ -26,7 +39,182 @@ from synthforge.models import (
     ClarificationResponse,
     Position,
 )
-from synthforge.prompts import get_interactive_agent_instructions
+from synthforge.prompts import get_interactive_agent_instructions, get_response_schema
+
+# Lookups reuse idle conversation threads; a thread is replaced after this many
+# runs so earlier turns do not keep growing the context sent with every run
+_THREAD_MAX_TURNS = 10
+
+# Corrections of resources detected below this confidence ask for a custom
+# service type before fetching suggestions
+_CUSTOM_TYPE_CONFIDENCE = 0.3
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+@lru_cache(maxsize=None)
+def _response_format(schema_name: str) -> ResponseFormatJsonSchemaType:
+    """Build (once per schema) the structured-output format for a lookup run."""
+    return ResponseFormatJsonSchemaType(
+        json_schema=ResponseFormatJsonSchema(
+            name=schema_name,
+            schema=get_response_schema(schema_name),
+        )
+    )
+
+
+class _ConsoleReader:
+    """Reads console lines on one long-lived daemon thread.
+    
+    Lookups keep progressing while the user types, and an interrupted prompt
+    does not hold up interpreter shutdown. A prompt that is cancelled while
+    input() is blocked leaves that read in place: the next prompt is shown
+    and receives the line, instead of a second reader competing for stdin.
+    """
+    
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: "queue.SimpleQueue[tuple[str, concurrent.futures.Future]]" = queue.SimpleQueue()
+        self._pending: Optional[concurrent.futures.Future] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    async def read(self, prompt: str) -> str:
+        with self._lock:
+            pending = self._pending
+            if pending is None or pending.done():
+                pending = self._pending = concurrent.futures.Future()
+                self._requests.put((prompt, pending))
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="synthforge-input", daemon=True
+                    )
+                    self._thread.start()
+            else:
+                # input() is still blocked for a cancelled prompt - show this
+                # prompt and take the line it returns
+                sys.stdout.write(prompt)
+                sys.stdout.flush()
+        
+        # Shielded so a cancelled prompt leaves the read for the next one
+        return await asyncio.shield(asyncio.wrap_future(pending))
+    
+    def _run(self) -> None:
+        while True:
+            prompt, future = self._requests.get()
+            try:
+                line = input(prompt)
+            except (EOFError, ValueError) as e:
+                future.set_exception(e)
+            else:
+                future.set_result(line)
+
+
+_CONSOLE = _ConsoleReader()
+
+
+async def _read_line(prompt: str) -> str:
+    """Read a console line without blocking the event loop (see _ConsoleReader)."""
+    return await _CONSOLE.read(prompt)
+
+
+def _holds_json_object(text: str) -> bool:
+    """Check whether text contains a complete JSON object after its first '{'."""
+    start = text.find("{")
+    if start == -1:
+        return False
+    try:
+        _JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+# Clarification answer keywords in priority order, each mapped to the answer
+# class it selects; one regex scan finds every keyword present (the lookahead
+# keeps one match from hiding an overlapping one, e.g. "yes" in "yeskip")
+_ANSWER_CLASSES = (
+    ("skip", "skip"),
+    ("remove", "remove"),
+    ("enter custom", "custom"),
+    ("microsoft.", "custom"),  # ARM type typed directly
+    ("/", "custom"),
+    ("keep", "keep"),
+    ("yes", "keep"),
+    ("different", "different"),
+    ("specify", "different"),
+)
+_ANSWER_KEYWORDS = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword, _ in _ANSWER_CLASSES) + "))",
+    re.IGNORECASE,
+)
+# A custom ARM type typed directly (contains "Microsoft." or "/")
+_ARM_TYPE_HINT = re.compile(r"microsoft\.|/", re.IGNORECASE)
+# Numbers in a list selection such as "1,3,5" or "1 3 5"
+_SEL_RE = re.compile(r"\d+")
+
+
+def _classify_answer(user_answer: str) -> str:
+    """Classify a clarification answer; 'option' when no keyword matches."""
+    found = {m.group(1).lower() for m in _ANSWER_KEYWORDS.finditer(user_answer)}
+    if found:
+        for keyword, answer_class in _ANSWER_CLASSES:
+            if keyword in found:
+                return answer_class
+    return "option"
+
+
+def _is_unknown(value: Optional[str]) -> bool:
+    """Whether a type value is missing, blank or 'Unknown' (in any case)."""
+    return not value or value.strip().lower() == "unknown"
+
+
+def _is_skip_answer(answer: str) -> bool:
+    """Whether a free-form answer is blank or asks to skip."""
+    stripped = answer.strip()
+    return not stripped or "skip" in stripped.lower()
+
+
+def _answer_or(answer: str, default: Optional[str]) -> Optional[str]:
+    """The stripped answer, or default when it is blank or 'unknown'."""
+    stripped = answer.strip()
+    if stripped and "unknown" not in stripped.lower():
+        return stripped
+    return default
+
+
+def _expects_custom_type(resource: DetectedIcon) -> bool:
+    """Whether a correction will most likely be typed in rather than picked from suggestions."""
+    return (
+        resource.confidence < _CUSTOM_TYPE_CONFIDENCE
+        or _is_unknown(resource.type)
+    )
+
+
+def _position_index(icons: Iterable[DetectedIcon]) -> dict[tuple[float, float], int]:
+    """Map each icon position to the index of its first occurrence."""
+    index: dict[tuple[float, float], int] = {}
+    for i, icon in enumerate(icons):
+        index.setdefault((icon.position.x, icon.position.y), i)
+    return index
+
+
+def _reindex_after_pop(
+    index: dict[tuple[float, float], int],
+    icons: List[DetectedIcon],
+    popped: int,
+    pos: tuple[float, float],
+) -> None:
+    """Update a position index after ``icons.pop(popped)`` removed the icon at ``pos``."""
+    del index[pos]
+    for i in range(popped, len(icons)):
+        key = (icons[i].position.x, icons[i].position.y)
+        if index.get(key) == i + 1:
+            index[key] = i
+    # Another icon at the same position now becomes the first occurrence
+    for i in range(popped, len(icons)):
+        if (icons[i].position.x, icons[i].position.y) == pos:
+            index[pos] = i
+            break
 
 
 class ClarificationType(str, Enum):
@@ -39,6 +227,34 @@ class ClarificationType(str, Enum):
     ADD_MISSING = "add_missing"
 
 
+# Question and option templates per clarification type, filled with the icon's
+# fields; multiple-options questions list the icon's clarification options first
+_CLARIFICATION_PROMPTS: dict[ClarificationType, tuple[str, tuple[str, ...]]] = {
+    ClarificationType.MULTIPLE_OPTIONS: (
+        "The detected icon '{type}' could be one of several services. Which is correct?",
+        ("Enter custom type", "Skip for now"),
+    ),
+    ClarificationType.UNKNOWN_ICON: (
+        "Could not identify the icon at position ({x:.0f}, {y:.0f}). What should we do?",
+        ("Keep as detected", "Remove from analysis", "Enter custom type", "Skip for now"),
+    ),
+    ClarificationType.LOW_CONFIDENCE: (
+        "Is '{type}' correctly identified? (confidence: {confidence})",
+        (
+            "Yes, this is {type}",
+            "No, this is a different service",
+            "Remove from analysis",
+            "Enter custom type",
+            "Skip for now",
+        ),
+    ),
+    ClarificationType.AMBIGUOUS_TYPE: (
+        "Please confirm the service type for '{name}':",
+        ("Keep as detected", "Specify different type", "Remove", "Enter custom type", "Skip for now"),
+    ),
+}
+
+
 class UserReviewResult:
     """Result of user review of all detected resources."""
     def __init__(self):
@@ -47,6 +263,11 @@ class UserReviewResult:
         self.removed: List[DetectedIcon] = []
         self.added: List[DetectedIcon] = []
     
+    @property
+    def final_count(self) -> int:
+        """Number of resources get_final_resources() would return, without building it."""
+        return len(self.confirmed) + len(self.corrected) + len(self.added)
+    
     def get_final_resources(self) -> List[DetectedIcon]:
         """Get the final list of resources after user review."""
         result = list(self.confirmed)
@@ -84,23 +305,35 @@ class InteractiveAgent:
         self.description_context = description_context
         self._client: Optional[AgentsClient] = None
         self._agent_id: Optional[str] = None
+        # Idle lookup threads; concurrent lookups each hold their own thread
+        # because a thread cannot run twice at once
+        self._idle_threads: List[str] = []
+        self._thread_turns: dict[str, int] = {}
+        # ARM type / category lookups keyed by normalized service name
+        self._arm_cache: dict[str, Optional[str]] = {}
+        self._cat_cache: dict[str, Optional[str]] = {}
+        # Running agent lookups keyed by (normalized service name, suggestion count)
+        self._lookups_in_flight: dict[tuple[str, int], asyncio.Task] = {}
     
     async def _default_input_handler(self, question: str, options: List[str]) -> str:
         """Default console-based input handler with flexible validation."""
-        print(f"\n{question}")
-        for i, option in enumerate(options, 1):
-            print(f"  {i}. {option}")
+        # Question and numbered options, written in one call
+        out = ["", question]
+        out += [f"  {i}. {option}" for i, option in enumerate(options, 1)]
+        sys.stdout.write("\n".join(out) + "\n")
         
         # Check if this is a multiple-choice question (has specific options)
         # vs free-form input (empty options list)
         is_multiple_choice = len(options) > 0
+        # Lowercased once per question, not per attempt
+        lowered_options = [(option.lower(), option) for option in options]
         
         while True:
             try:
                 if is_multiple_choice:
-                    choice = input("Enter choice (number or custom text): ").strip()
+                    choice = (await _read_line("Enter choice (number or custom text): ")).strip()
                 else:
-                    choice = input("Enter value: ").strip()
+                    choice = (await _read_line("Enter value: ")).strip()
                 
                 # Handle empty input
                 if not choice:
@@ -121,10 +354,10 @@ class InteractiveAgent:
                             print(f"⚠️  Number must be between 1 and {len(options)}")
                             continue
                     
-                    # Try as text match against options
+                    # Try as text match against options (first option containing it)
                     choice_lower = choice.lower()
-                    for option in options:
-                        if choice_lower in option.lower():
+                    for option_lower, option in lowered_options:
+                        if choice_lower in option_lower:
                             return option
                     
                     # Accept as free-form custom input (e.g., ARM type)
@@ -154,25 +387,45 @@ class InteractiveAgent:
         
         instructions = get_interactive_agent_instructions()
         
-        agent = self._client.create_agent(
-            model=self.settings.model_deployment_name,
-            name="InteractiveAgent",
-            instructions=instructions,
-            temperature=self.settings.model_temperature,
-            top_p=0.95,
+        agent, thread = await asyncio.gather(
+            self._run(
+                self._client.create_agent,
+                model=self.settings.model_deployment_name,
+                name="InteractiveAgent",
+                instructions=instructions,
+                temperature=self.settings.model_temperature,
+                top_p=0.95,
+            ),
+            self._run(self._client.threads.create),
         )
         self._agent_id = agent.id
+        self._idle_threads.append(thread.id)
         
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Cleanup the agent."""
+        if self._client:
+            for thread_id in self._idle_threads:
+                try:
+                    await self._run(self._client.threads.delete, thread_id)
+                except Exception:
+                    pass
+            self._idle_threads.clear()
         if self._client and self._agent_id:
             try:
-                self._client.delete_agent(self._agent_id)
+                await self._run(self._client.delete_agent, self._agent_id)
             except Exception:
                 pass
     
+    async def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking AgentsClient call in a worker thread.
+        
+        The SDK client is synchronous; calling it directly would block the
+        event loop (and with it console input and concurrent lookups).
+        """
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    
     async def review_all_resources(
         self,
         detected_resources: List[DetectedIcon],
@@ -200,26 +453,22 @@ class InteractiveAgent:
                 ["Yes, add resources", "No, continue with empty list"]
             )
             
-            if "yes" in add_response.lower() or "add" in add_response.lower():
+            add_response = add_response.lower()
+            if "yes" in add_response or "add" in add_response:
                 await self._add_missing_resources(result)
             
             return result
         
-        # Display detected resources (simple list)
-        resource_lines = []
+        # Display detected resources (simple list), written in one call
+        rule = "=" * 60
+        out = ["", rule, "DETECTED AZURE RESOURCES - Please Review", rule]
         for i, r in enumerate(detected_resources, 1):
-            instance = r.name or "Unnamed"
-            arm_type = r.arm_resource_type or "Unknown ARM type"
-            resource_lines.append(
-                f"  {i}. {r.type} ({instance}) | confidence: {r.confidence:.0%} | {arm_type}"
+            out.append(
+                f"  {i}. {r.type} ({r.display_name}) | confidence: {r.display_confidence}"
+                f" | {r.display_arm_type}"
             )
-        resource_list = "\n".join(resource_lines)
-        
-        print(f"\n{'='*60}")
-        print("DETECTED AZURE RESOURCES - Please Review")
-        print(f"{'='*60}")
-        print(resource_list)
-        print(f"{'='*60}\n")
+        out += [rule, "", ""]
+        sys.stdout.write("\n".join(out))
         
         # Ask for review action
         review_action = await self.input_handler(
@@ -232,20 +481,33 @@ class InteractiveAgent:
             ]
         )
         
-        if "confirm" in review_action.lower():
+        review_action = review_action.lower()
+        if "confirm" in review_action:
             # User confirms all resources as-is
             result.confirmed = list(detected_resources)
             
-        elif "review each" in review_action.lower():
-            # Review each resource one by one
-            await self._review_each_resource(detected_resources, result)
+        elif "review each" in review_action:
+            # Auto-confirm confident, unambiguous detections and review the rest one by one
+            threshold = self.settings.auto_confirm_threshold
+            to_review = []
+            for r in detected_resources:
+                if r.confidence >= threshold and not r.needs_clarification:
+                    result.confirmed.append(r)
+                else:
+                    to_review.append(r)
+            if result.confirmed:
+                print(
+                    f"Auto-confirmed {len(result.confirmed)} high-confidence resources"
+                    f" (>= {threshold:.0%}); reviewing {len(to_review)}"
+                )
+            await self._review_each_resource(to_review, result)
             
-        elif "quick" in review_action.lower():
+        elif "quick" in review_action:
             # Quick edit mode - ask which to modify
             result.confirmed = list(detected_resources)  # Start with all confirmed
             await self._quick_edit_resources(detected_resources, result)
             
-        elif "add" in review_action.lower():
+        elif "add" in review_action:
             # Add missing resources
             result.confirmed = list(detected_resources)
             # First show description-detected missing resources
@@ -258,14 +520,14 @@ class InteractiveAgent:
             result.confirmed = list(detected_resources)
         
         # Final summary
-        total = len(result.get_final_resources())
-        print(f"\n✓ Final resource count: {total} resources")
+        out = ["", f"✓ Final resource count: {result.final_count} resources"]
         if result.corrected:
-            print(f"  - {len(result.corrected)} corrected")
+            out.append(f"  - {len(result.corrected)} corrected")
         if result.removed:
-            print(f"  - {len(result.removed)} removed")
+            out.append(f"  - {len(result.removed)} removed")
         if result.added:
-            print(f"  - {len(result.added)} added")
+            out.append(f"  - {len(result.added)} added")
+        sys.stdout.write("\n".join(out) + "\n")
         
         return result
     
@@ -275,15 +537,20 @@ class InteractiveAgent:
         result: UserReviewResult
     ):
         """Review each detected resource individually."""
+        # Corrections are collected during the review and resolved afterwards,
+        # so their agent lookups can run concurrently
+        to_correct: List[DetectedIcon] = []
+        
         for i, resource in enumerate(resources, 1):
-            print(f"\n[{i}/{len(resources)}] {resource.type}")
+            header = [f"\n[{i}/{len(resources)}] {resource.type}"]
             if resource.name:
-                print(f"    Name: {resource.name}")
-            print(f"    Confidence: {resource.confidence:.0%}")
+                header.append(f"    Name: {resource.name}")
+            header.append(f"    Confidence: {resource.display_confidence}")
             if resource.arm_resource_type:
-                print(f"    ARM Type: {resource.arm_resource_type}")
+                header.append(f"    ARM Type: {resource.arm_resource_type}")
             if resource.resource_category:
-                print(f"    Category: {resource.resource_category}")
+                header.append(f"    Category: {resource.resource_category}")
+            sys.stdout.write("\n".join(header) + "\n")
             
             action = await self.input_handler(
                 "What would you like to do with this resource?",
@@ -295,17 +562,17 @@ class InteractiveAgent:
                 ]
             )
             
-            if "confirm" in action.lower():
+            action = action.lower()
+            if "confirm" in action:
                 result.confirmed.append(resource)
                 
-            elif "correct" in action.lower():
-                corrected = await self._correct_resource(resource)
-                result.corrected.append((resource, corrected))
+            elif "correct" in action:
+                to_correct.append(resource)
                 
-            elif "remove" in action.lower():
+            elif "remove" in action:
                 result.removed.append(resource)
                 
-            elif "skip" in action.lower():
+            elif "skip" in action:
                 # Confirm this and all remaining resources
                 result.confirmed.append(resource)
                 result.confirmed.extend(resources[i:])
@@ -314,156 +581,319 @@ class InteractiveAgent:
                 # Default: confirm
                 result.confirmed.append(resource)
         
+        if to_correct:
+            # Barely-identified resources ask for a custom type first, so
+            # their suggestions are only fetched on demand
+            fetched = iter(await asyncio.gather(*[
+                self._suggest_all(r) for r in to_correct if not _expects_custom_type(r)
+            ]))
+            for resource in to_correct:
+                suggested = None if _expects_custom_type(resource) else next(fetched)
+                corrected = await self._correct_resource(resource, suggested)
+                result.corrected.append((resource, corrected))
+        
         # Ask if user wants to add missing resources
         add_more = await self.input_handler(
             "Would you like to add any resources that were not detected?",
             ["No, continue", "Yes, add resources"]
         )
         
-        if "yes" in add_more.lower() or "add" in add_more.lower():
+        add_more = add_more.lower()
+        if "yes" in add_more or "add" in add_more:
             await self._add_missing_resources(result)
     
-    async def _correct_resource(self, resource: DetectedIcon) -> DetectedIcon:
-        """Get corrected information for a resource from user."""
-        # Use agent to suggest corrections
-        suggestions = await self._get_correction_suggestions(resource)
-        
-        new_type = await self.input_handler(
-            f"What is the correct Azure service type for this resource?",
-            suggestions + ["Enter custom type..."]
-        )
+    async def _correct_resource(
+        self,
+        resource: DetectedIcon,
+        suggested: Optional[dict[str, Any]] = None,
+    ) -> DetectedIcon:
+        """Get corrected information for a resource from user.
         
-        if "custom" in new_type.lower() or "enter" in new_type.lower():
-            new_type = await self.input_handler(
-                "Enter the correct Azure service name:",
+        Args:
+            resource: Resource being corrected
+            suggested: Prefetched ``_suggest_all`` result for the resource
+        """
+        new_type = ""
+        if suggested is None and _expects_custom_type(resource):
+            # Users nearly always type the service for barely-identified icons;
+            # ask first and only fetch suggestions if they decline
+            new_type = (await self.input_handler(
+                f"Enter the correct Azure service name for '{resource.type or 'Unknown'}' "
+                f"(or press Enter to see suggestions):",
                 []
+            )).strip()
+        
+        details: dict[str, dict[str, Any]] = {}
+        if not new_type:
+            # One agent run returns the suggested services together with their
+            # ARM types and categories, so picking a suggestion needs no further calls
+            if suggested is None:
+                suggested = await self._suggest_all(resource)
+            details = {s["service"]: s for s in suggested["suggestions"]}
+            
+            new_type = await self.input_handler(
+                f"What is the correct Azure service type for '{resource.type}'?",
+                list(details) + ["Enter custom type..."]
             )
+            
+            new_type_lower = new_type.lower()
+            if "custom" in new_type_lower or "enter" in new_type_lower:
+                new_type = await self.input_handler(
+                    "Enter the correct Azure service name:",
+                    []
+                )
         
-        # Get ARM type and category suggestions from agent
-        arm_type = await self._suggest_arm_type(new_type)
-        category = await self._suggest_category(new_type)
-        
-        return DetectedIcon(
-            type=new_type,
-            name=resource.name,
-            position=resource.position,
-            bounding_box=resource.bounding_box,
-            confidence=1.0,  # User-corrected
-            arm_resource_type=arm_type,
-            resource_category=category,
-            needs_clarification=False,
-        )
+        if new_type in details:
+            arm_type = details[new_type]["arm_resource_type"]
+            category = details[new_type]["category"]
+        else:
+            # Custom entry - resolve ARM type and category in a single run
+            lookup = await self._suggest_all(new_type, count=0)
+            arm_type = lookup["arm_resource_type"]
+            category = lookup["category"]
+        
+        # Drop fields describing the old service type
+        return resource.model_copy(update={
+            "type": new_type,
+            "confidence": 1.0,  # User-corrected
+            "arm_resource_type": arm_type,
+            "resource_category": category,
+            "reasoning": None,
+            "connections": [],
+            "needs_clarification": False,
+            "clarification_options": None,
+        })
     
-    async def _get_correction_suggestions(self, resource: DetectedIcon) -> List[str]:
-        """Use agent to suggest possible correct service types."""
+    async def _suggest_all(
+        self,
+        resource: DetectedIcon | str,
+        count: int = 5,
+    ) -> dict[str, Any]:
+        """
+        Use agent to suggest alternatives, ARM type and category in one run.
+        
+        Args:
+            resource: Detected resource (or plain service name) to look up
+            count: Number of alternative services to suggest (0 = lookup only)
+            
+        Returns:
+            Dict with ``arm_resource_type`` and ``category`` for the service
+            itself, plus ``suggestions``: a list of dicts with ``service``,
+            ``arm_resource_type`` and ``category`` for each alternative.
+        """
+        result: dict[str, Any] = {
+            "suggestions": [],
+            "arm_resource_type": None,
+            "category": None,
+        }
         if not self._client or not self._agent_id:
-            # No static fallbacks - let user type service name manually
-            return []
+            # No static fallbacks - let user type values manually
+            return result
         
-        # Ask agent for suggestions
-        thread = self._client.threads.create()
+        service_name = resource.type if isinstance(resource, DetectedIcon) else resource
+        key = service_name.strip().lower()
         
-        self._client.messages.create(
-            thread_id=thread.id,
-            role="user",
-            content=f"""The detected service '{resource.type}' may be incorrect.
-Suggest 5 similar Azure services it could be. Just list the service names, one per line."""
-        )
-        
-        run = self._client.runs.create_and_process(
-            thread_id=thread.id,
-            agent_id=self._agent_id,
-        )
+        if not count and key in self._arm_cache and key in self._cat_cache:
+            result["arm_resource_type"] = self._arm_cache[key]
+            result["category"] = self._cat_cache[key]
+            return result
         
-        if run.status == "completed":
-            last_msg = self._client.messages.get_last_message_text_by_role(
-                thread_id=thread.id,
-                role=MessageRole.AGENT,
-            )
-            if last_msg:
-                lines = [l.strip() for l in last_msg.text.value.strip().split('\n') if l.strip()]
-                # Clean up numbering and bullets
-                suggestions = []
-                for line in lines[:5]:
-                    line = line.lstrip('0123456789.-) ')
-                    if line:
-                        suggestions.append(line)
-                if suggestions:
-                    return suggestions
-        
-        # No static fallbacks - return empty list
-        return []
+        # Concurrent requests for the same service and count share one agent
+        # run (and its result dict, which callers only read)
+        flight = (key, count)
+        in_flight = self._lookups_in_flight.get(flight)
+        if in_flight is None:
+            in_flight = asyncio.create_task(self._fetch_suggestions(service_name, key, count))
+            self._lookups_in_flight[flight] = in_flight
+            in_flight.add_done_callback(lambda _, f=flight: self._lookups_in_flight.pop(f, None))
+        # Shielded so one cancelled caller does not cancel the shared run
+        return await asyncio.shield(in_flight)
     
-    async def _suggest_arm_type(self, service_name: str) -> Optional[str]:
-        """Use agent to suggest ARM resource type for a service."""
-        if not self._client or not self._agent_id:
-            return None
-        
-        thread = self._client.threads.create()
+    async def _fetch_suggestions(self, service_name: str, key: str, count: int) -> dict[str, Any]:
+        """Run the agent for ``_suggest_all`` and update the lookup caches."""
+        result: dict[str, Any] = {
+            "suggestions": [],
+            "arm_resource_type": None,
+            "category": None,
+        }
+        
+        # The reply shape is enforced by the response schema, so the prompt
+        # only needs to describe the values
+        if count:
+            schema_name = "service_suggestions"
+            request = f"""The detected service '{service_name}' may be incorrect.
+Give the ARM resource type and Azure service category of '{service_name}',
+and suggest {count} similar Azure services it could be, each with its ARM
+resource type and category."""
+        else:
+            schema_name = "service_lookup"
+            request = f"""What is the ARM resource type and Azure service category for '{service_name}'?"""
         
-        self._client.messages.create(
-            thread_id=thread.id,
-            role="user",
-            content=f"""What is the ARM resource type for '{service_name}'?
-Reply with ONLY the ARM type like 'Microsoft.Web/sites' or 'Microsoft.Storage/storageAccounts'.
-No explanation needed."""
-        )
+        response_text = await self._run_lookup(schema_name, f"""{request}
+
+Search Microsoft Learn documentation first using MCP, then Bing if needed.
+Use null for any value you cannot determine. No explanation needed.
+Answer only this request; disregard earlier messages in this thread.""")
+        if not response_text:
+            return result
         
-        run = self._client.runs.create_and_process(
-            thread_id=thread.id,
-            agent_id=self._agent_id,
-        )
+        # Decode the object itself; code fences around it (or a closing fence
+        # cut off by the early-stopped stream) are ignored
+        start = response_text.find("{")
+        if start == -1:
+            return result
+        try:
+            data, _ = _JSON_DECODER.raw_decode(response_text, start)
+        except json.JSONDecodeError:
+            return result
+        if not isinstance(data, dict):
+            return result
         
-        if run.status == "completed":
-            last_msg = self._client.messages.get_last_message_text_by_role(
-                thread_id=thread.id,
-                role=MessageRole.AGENT,
-            )
-            if last_msg:
-                arm_type = last_msg.text.value.strip()
-                if arm_type.startswith("Microsoft."):
-                    return arm_type
+        result["arm_resource_type"] = self._valid_arm_type(data.get("arm_resource_type"))
+        result["category"] = self._valid_category(data.get("category"))
+        self._arm_cache[key] = result["arm_resource_type"]
+        self._cat_cache[key] = result["category"]
+        
+        # Replies are not held to the schema strictly - skip malformed entries
+        suggestions = data.get("suggestions") or []
+        if not isinstance(suggestions, list):
+            suggestions = []
+        for item in suggestions[:count]:
+            if not isinstance(item, dict):
+                continue
+            service = item.get("service") or ""
+            service = service.strip() if isinstance(service, str) else ""
+            if service:
+                suggestion = {
+                    "service": service,
+                    "arm_resource_type": self._valid_arm_type(item.get("arm_resource_type")),
+                    "category": self._valid_category(item.get("category")),
+                }
+                result["suggestions"].append(suggestion)
+                # Suggested services are likely follow-up lookups
+                self._arm_cache.setdefault(service.lower(), suggestion["arm_resource_type"])
+                self._cat_cache.setdefault(service.lower(), suggestion["category"])
         
-        return None
+        return result
     
-    async def _suggest_category(self, service_name: str) -> Optional[str]:
-        """Use agent to suggest Azure service category from MCP/Bing documentation.
+    async def _run_lookup(self, schema_name: str, content: str) -> Optional[str]:
+        """Post one message on an idle lookup thread and return the agent's JSON reply.
         
-        Priority:
-        1. Microsoft Learn MCP search (official docs)
-        2. Bing Grounding (fallback)
+        Args:
+            schema_name: Response schema (from agent_instructions.yaml) the reply must follow
+            content: Message to post
         """
-        if not self._client or not self._agent_id:
-            return None
+        thread_id = await self._acquire_thread()
+        # Only a clean stream return hands the thread back; after an exception
+        # its run may still be active and would reject the next message
+        reusable = False
+        try:
+            await self._run(
+                self._client.messages.create,
+                thread_id=thread_id,
+                role="user",
+                content=content,
+            )
+            
+            reply, reusable = await self._run(
+                self._stream_reply, thread_id, _response_format(schema_name)
+            )
+            return reply
+        finally:
+            if reusable:
+                self._idle_threads.append(thread_id)
+            else:
+                # A cancelled or failed run may still be winding down; a new
+                # message on this thread would be rejected, so retire it
+                self._thread_turns.pop(thread_id, None)
+                try:
+                    await self._run(self._client.threads.delete, thread_id)
+                except Exception:
+                    pass
+    
+    def _stream_reply(
+        self,
+        thread_id: str,
+        response_format: ResponseFormatJsonSchemaType,
+    ) -> tuple[Optional[str], bool]:
+        """
+        Stream a run and stop as soon as the reply holds a complete JSON object.
         
-        thread = self._client.threads.create()
+        Lookup replies are a single JSON object, so anything the model emits
+        after its closing brace is discarded anyway; the run is cancelled at
+        that point to stop generating (and billing) those tokens. Streaming
+        also returns as soon as the reply is done instead of waiting for the
+        next ``create_and_process`` poll.
         
-        self._client.messages.create(
-            thread_id=thread.id,
-            role="user",
-            content=f"""What Azure service category does '{service_name}' belong to?
-
-Search Microsoft Learn documentation first using MCP, then Bing if needed.
-Reply with ONLY the official Azure category name from documentation.
-No explanation needed."""
-        )
+        Returns:
+            (reply text or None, whether the thread can be reused)
+        """
+        chunks: List[str] = []
+        run_id: Optional[str] = None
         
-        run = self._client.runs.create_and_process(
-            thread_id=thread.id,
+        with self._client.runs.stream(
+            thread_id=thread_id,
             agent_id=self._agent_id,
-        )
+            response_format=response_format,
+        ) as stream:
+            for event_type, event_data, _ in stream:
+                if isinstance(event_data, ThreadRun):
+                    run_id = event_data.id
+                    if event_data.status in ("failed", "cancelled", "expired"):
+                        return None, True
+                elif isinstance(event_data, MessageDeltaChunk):
+                    chunks.append(event_data.text)
+                    if "}" in event_data.text and _holds_json_object("".join(chunks)):
+                        break
+                elif event_type == AgentStreamEvent.ERROR:
+                    # The run's state is unknown - do not reuse the thread
+                    return None, False
+            else:
+                # Stream ended on its own - the run is complete
+                return ("".join(chunks) or None), True
         
-        if run.status == "completed":
-            last_msg = self._client.messages.get_last_message_text_by_role(
-                thread_id=thread.id,
-                role=MessageRole.AGENT,
-            )
-            if last_msg:
-                category = last_msg.text.value.strip()
-                # Validate it looks like a real category (not a full sentence)
-                if category and len(category) < 50 and not category.endswith('.'):
-                    return category
+        reusable = False
+        if run_id:
+            try:
+                run = self._client.runs.cancel(thread_id=thread_id, run_id=run_id)
+                reusable = run.status in ("cancelled", "completed")
+            except Exception:
+                # The run most likely completed in the meantime
+                pass
+        return "".join(chunks), reusable
+    
+    async def _acquire_thread(self) -> str:
+        """Take an idle lookup thread, replacing it once it has run enough turns."""
+        thread_id = self._idle_threads.pop() if self._idle_threads else None
+        
+        if thread_id and self._thread_turns.get(thread_id, 0) >= _THREAD_MAX_TURNS:
+            try:
+                await self._run(self._client.threads.delete, thread_id)
+            except Exception:
+                pass
+            self._thread_turns.pop(thread_id, None)
+            thread_id = None
         
+        if not thread_id:
+            thread_id = (await self._run(self._client.threads.create)).id
+        
+        self._thread_turns[thread_id] = self._thread_turns.get(thread_id, 0) + 1
+        return thread_id
+    
+    @staticmethod
+    def _valid_arm_type(value: Any) -> Optional[str]:
+        """Return the ARM type if it looks like one, else None."""
+        if isinstance(value, str) and value.strip().startswith("Microsoft."):
+            return value.strip()
+        return None
+    
+    @staticmethod
+    def _valid_category(value: Any) -> Optional[str]:
+        """Return the category if it looks like a name (not a full sentence), else None."""
+        if isinstance(value, str):
+            category = value.strip()
+            if category and len(category) < 50 and not category.endswith('.'):
+                return category
         return None
     
     async def _quick_edit_resources(
@@ -472,15 +902,21 @@ No explanation needed."""
         result: UserReviewResult
     ):
         """Quick edit mode - user specifies which resources to modify."""
+        # Position -> list index for confirmed resources and corrections, kept
+        # in sync with every mutation so edits never rescan the lists
+        conf_pos_idx = _position_index(result.confirmed)
+        corr_pos_idx = _position_index(original for original, _ in result.corrected)
+        
         while True:
             edit_input = await self.input_handler(
                 "Enter resource number to edit (or 'done' to finish, 'add' to add new):",
                 [f"{i}. {r.type}" for i, r in enumerate(resources, 1)] + ["done", "add"]
             )
             
-            if "done" in edit_input.lower():
+            edit_lower = edit_input.lower()
+            if "done" in edit_lower:
                 break
-            elif "add" in edit_input.lower():
+            elif "add" in edit_lower:
                 await self._add_missing_resources(result)
             else:
                 # Try to parse resource number
@@ -493,32 +929,25 @@ No explanation needed."""
                     
                     if 0 <= idx < len(resources):
                         resource = resources[idx]
+                        pos = (resource.position.x, resource.position.y)
                         
                         # Check if this resource already has a correction (by position matching)
                         # If yes, we'll update that correction instead of adding a new one
-                        existing_correction_idx = None
+                        existing_correction_idx = corr_pos_idx.get(pos)
                         base_resource = resource  # The resource we're editing
-                        
-                        for corr_idx, (original, corrected) in enumerate(result.corrected):
-                            if (original.position.x == resource.position.x and 
-                                original.position.y == resource.position.y):
-                                existing_correction_idx = corr_idx
-                                # Use the LATEST corrected version as the base for further edits
-                                base_resource = corrected
-                                break
+                        if existing_correction_idx is not None:
+                            # Use the LATEST corrected version as the base for further edits
+                            base_resource = result.corrected[existing_correction_idx][1]
                         
                         # If NOT already corrected, remove from confirmed list
                         # (If already corrected, it's not in confirmed anymore)
                         if existing_correction_idx is None:
-                            confirmed_idx_to_remove = None
-                            for conf_idx, confirmed_resource in enumerate(result.confirmed):
-                                if (confirmed_resource.position.x == resource.position.x and 
-                                    confirmed_resource.position.y == resource.position.y):
-                                    confirmed_idx_to_remove = conf_idx
-                                    break
-                            
+                            confirmed_idx_to_remove = conf_pos_idx.get(pos)
                             if confirmed_idx_to_remove is not None:
                                 result.confirmed.pop(confirmed_idx_to_remove)
+                                _reindex_after_pop(
+                                    conf_pos_idx, result.confirmed, confirmed_idx_to_remove, pos
+                                )
                         
                         action = await self.input_handler(
                             f"What would you like to edit for '{base_resource.type}'?",
@@ -546,27 +975,22 @@ No explanation needed."""
                             if existing_correction_idx is not None:
                                 result.corrected[existing_correction_idx] = (resource, corrected)
                             else:
+                                corr_pos_idx.setdefault(pos, len(result.corrected))
                                 result.corrected.append((resource, corrected))
                         elif action_num == 2 or "resource name" in action_lower or action_lower == "2":
                             new_name = await self.input_handler(
                                 f"Enter new resource name for '{base_resource.type}' (current: {base_resource.name or 'None'}):",
                                 []
                             )
-                            updated = DetectedIcon(
-                                type=base_resource.type,
-                                name=new_name.strip() if new_name.strip() else None,
-                                position=base_resource.position,
-                                bounding_box=base_resource.bounding_box,
-                                confidence=base_resource.confidence,
-                                arm_resource_type=base_resource.arm_resource_type,
-                                resource_category=base_resource.resource_category,
-                                connections=base_resource.connections,
-                                needs_clarification=False,
-                            )
+                            updated = base_resource.model_copy(update={
+                                "name": new_name.strip() or None,
+                                "needs_clarification": False,
+                            })
                             # Update existing correction or add new one
                             if existing_correction_idx is not None:
                                 result.corrected[existing_correction_idx] = (resource, updated)
                             else:
+                                corr_pos_idx.setdefault(pos, len(result.corrected))
                                 result.corrected.append((resource, updated))
                         elif action_num == 3 or "arm type" in action_lower or action_lower == "3":
                             current_arm = base_resource.arm_resource_type or "Unknown"
@@ -575,21 +999,15 @@ No explanation needed."""
                                 []
                             )
                             if new_arm_type.strip():
-                                updated = DetectedIcon(
-                                    type=base_resource.type,
-                                    name=base_resource.name,
-                                    position=base_resource.position,
-                                    bounding_box=base_resource.bounding_box,
-                                    confidence=base_resource.confidence,
-                                    arm_resource_type=new_arm_type.strip(),
-                                    resource_category=base_resource.resource_category,
-                                    connections=base_resource.connections,
-                                    needs_clarification=False,
-                                )
+                                updated = base_resource.model_copy(update={
+                                    "arm_resource_type": new_arm_type.strip(),
+                                    "needs_clarification": False,
+                                })
                                 # Update existing correction or add new one
                                 if existing_correction_idx is not None:
                                     result.corrected[existing_correction_idx] = (resource, updated)
                                 else:
+                                    corr_pos_idx.setdefault(pos, len(result.corrected))
                                     result.corrected.append((resource, updated))
                         elif action_num == 4 or "category" in action_lower or action_lower == "4":
                             current_cat = base_resource.resource_category or "Unknown"
@@ -598,27 +1016,27 @@ No explanation needed."""
                                 []
                             )
                             if new_category.strip():
-                                updated = DetectedIcon(
-                                    type=base_resource.type,
-                                    name=base_resource.name,
-                                    position=base_resource.position,
-                                    bounding_box=base_resource.bounding_box,
-                                    confidence=base_resource.confidence,
-                                    arm_resource_type=base_resource.arm_resource_type,
-                                    resource_category=new_category.strip(),
-                                    connections=base_resource.connections,
-                                    needs_clarification=False,
-                                )
+                                updated = base_resource.model_copy(update={
+                                    "resource_category": new_category.strip(),
+                                    "needs_clarification": False,
+                                })
                                 # Update existing correction or add new one
                                 if existing_correction_idx is not None:
                                     result.corrected[existing_correction_idx] = (resource, updated)
                                 else:
+                                    corr_pos_idx.setdefault(pos, len(result.corrected))
                                     result.corrected.append((resource, updated))
                         elif action_num == 5 or "remove" in action_lower or action_lower == "5":
                             # Explicitly remove only if user chose option 5
                             # If already corrected, remove the correction; otherwise remove from original resource
                             if existing_correction_idx is not None:
                                 result.corrected.pop(existing_correction_idx)
+                                _reindex_after_pop(
+                                    corr_pos_idx,
+                                    [original for original, _ in result.corrected],
+                                    existing_correction_idx,
+                                    pos,
+                                )
                             result.removed.append(resource)
                         else:
                             # Invalid input - re-add resource to confirmed and warn user
@@ -626,6 +1044,7 @@ No explanation needed."""
                             print(f"   Resource '{base_resource.type}' kept unchanged.")
                             # Only re-add if not already corrected
                             if existing_correction_idx is None:
+                                conf_pos_idx.setdefault(pos, len(result.confirmed))
                                 result.confirmed.append(resource)
                 except (ValueError, IndexError):
                     print("Invalid selection. Try again.")
@@ -652,19 +1071,26 @@ No explanation needed."""
             normalized = icon.type.lower().replace("azure ", "").replace("microsoft ", "").strip()
             detected_types.add(normalized)
         
+        # Fuzzy matching: a component is found if it is a substring of a detected
+        # type or vice versa. Both directions are single C-level searches:
+        # "component in detected" against all detected types joined by a
+        # separator that cannot occur in names, and "detected in component"
+        # via one regex alternation of all detected types.
+        detected_haystack = "\0".join(detected_types)
+        detected_pattern = re.compile(
+            "|".join(re.escape(d) for d in sorted(detected_types, key=len, reverse=True))
+        ) if detected_types else None
+        
         # Check for missing resources
         missing = []
         for comp in all_description_components:
             # Normalize component name
             normalized_comp = comp.lower().replace("azure ", "").replace("microsoft ", "").strip()
             
-            # Check if any detected type contains this component or vice versa
-            found = False
-            for detected in detected_types:
-                # Fuzzy matching: check substring match in either direction
-                if normalized_comp in detected or detected in normalized_comp:
-                    found = True
-                    break
+            found = detected_pattern is not None and (
+                normalized_comp in detected_haystack
+                or detected_pattern.search(normalized_comp) is not None
+            )
             
             if not found:
                 missing.append(comp)
@@ -672,20 +1098,23 @@ No explanation needed."""
         if not missing:
             return
         
-        print(f"\n--- Description Detected {len(missing)} Missing Resources ---")
-        print("The architecture description identified these components that were not detected by Vision:\n")
-        
-        for i, resource in enumerate(missing, 1):
-            print(f"  {i}. {resource}")
-        
-        print("\nWould you like to add any of these resources?")
+        out = [
+            "",
+            f"--- Description Detected {len(missing)} Missing Resources ---",
+            "The architecture description identified these components that were not detected by Vision:",
+            "",
+        ]
+        out += [f"  {i}. {resource}" for i, resource in enumerate(missing, 1)]
+        out += ["", "Would you like to add any of these resources?", ""]
+        sys.stdout.write("\n".join(out))
         
         add_from_description = await self.input_handler(
             "Add resources from description?",
             ["No, skip to manual add", "Yes, select from list"]
         )
         
-        if "yes" not in add_from_description.lower() and "select" not in add_from_description.lower():
+        add_from_description = add_from_description.lower()
+        if "yes" not in add_from_description and "select" not in add_from_description:
             return
         
         # Allow user to select which ones to add
@@ -695,32 +1124,35 @@ No explanation needed."""
             ["all", "none"]
         )
         
-        if "none" in selection_input.lower():
+        selection_lower = selection_input.lower()
+        if "none" in selection_lower:
             return
         
         # Parse selection
-        selected_indices = []
-        if "all" in selection_input.lower():
+        if "all" in selection_lower:
             selected_indices = list(range(len(missing)))
         else:
-            # Parse comma-separated numbers
-            try:
-                parts = selection_input.split(",")
-                for part in parts:
-                    idx = int(part.strip()) - 1  # Convert to 0-based
-                    if 0 <= idx < len(missing):
-                        selected_indices.append(idx)
-            except ValueError:
-                print("Invalid selection format. Skipping description suggestions.")
+            # Every number in the input, converted to 0-based; other text is ignored
+            selected_indices = [
+                idx for idx in (int(n) - 1 for n in _SEL_RE.findall(selection_input))
+                if 0 <= idx < len(missing)
+            ]
+            if not selected_indices:
+                print("No valid selection. Skipping description suggestions.")
                 return
         
-        # Add selected resources
-        for idx in selected_indices:
+        # Look up ARM type and category for all selected resources concurrently
+        lookups = await asyncio.gather(
+            *[self._suggest_all(missing[idx], count=0) for idx in selected_indices]
+        )
+        
+        # Add selected resources, reporting them together
+        added = []
+        for idx, lookup in zip(selected_indices, lookups):
             service_name = missing[idx]
             
-            # Get ARM type suggestion from agent
-            suggested_arm_type = await self._suggest_arm_type(service_name)
-            suggested_category = await self._suggest_category(service_name)
+            suggested_arm_type = lookup["arm_resource_type"]
+            suggested_category = lookup["category"]
             
             # Create resource with suggested values
             new_resource = DetectedIcon(
@@ -733,7 +1165,12 @@ No explanation needed."""
                 needs_clarification=False,
             )
             result.added.append(new_resource)
-            print(f"✓ Added from description: {service_name} | ARM: {suggested_arm_type or 'Unknown'}" + (f" | Category: {suggested_category}" if suggested_category else ""))
+            line = f"✓ Added from description: {service_name} | ARM: {suggested_arm_type or 'Unknown'}"
+            if suggested_category:
+                line += f" | Category: {suggested_category}"
+            added.append(line)
+        if added:
+            sys.stdout.write("\n".join(added) + "\n")
     
     async def _add_missing_resources(self, result: UserReviewResult):
         """Allow user to add resources that were not detected."""
@@ -748,17 +1185,25 @@ No explanation needed."""
             if "done" in service_name.lower() or not service_name.strip():
                 break
             
+            # Start the ARM type and category lookup while the user names the resource
+            lookup_task = asyncio.create_task(self._suggest_all(service_name, count=0))
+            
             # Get optional resource name
-            resource_name = await self.input_handler(
-                f"Enter a name for this {service_name} (optional, press Enter to skip):",
-                []
-            )
+            try:
+                resource_name = await self.input_handler(
+                    f"Enter a name for this {service_name} (optional, press Enter to skip):",
+                    []
+                )
+            except BaseException:
+                lookup_task.cancel()
+                raise
             
-            # Get ARM type suggestion from agent
-            suggested_arm_type = await self._suggest_arm_type(service_name)
+            lookup = await lookup_task
+            suggested_arm_type = lookup["arm_resource_type"]
+            suggested_category = lookup["category"]
             
             # Ask user to confirm or provide ARM type
-            if suggested_arm_type and suggested_arm_type != "Unknown":
+            if not _is_unknown(suggested_arm_type):
                 arm_type_input = await self.input_handler(
                     f"ARM resource type for '{service_name}' (detected: {suggested_arm_type}):",
                     [f"Use detected: {suggested_arm_type}", "Enter manually"]
@@ -778,10 +1223,7 @@ No explanation needed."""
                     f"ARM resource type for '{service_name}' (e.g., Microsoft.Storage/storageAccounts):",
                     ["Unknown"]
                 )
-                arm_type = arm_type_input.strip() if arm_type_input.strip() and "unknown" not in arm_type_input.lower() else "Unknown"
-            
-            # Get category suggestion from agent
-            suggested_category = await self._suggest_category(service_name)
+                arm_type = _answer_or(arm_type_input, "Unknown")
             
             # Ask user to confirm or provide category
             if suggested_category:
@@ -816,7 +1258,14 @@ No explanation needed."""
                 needs_clarification=False,
             )
             result.added.append(new_resource)
-            print(f"✓ Added: {service_name}" + (f" ({resource_name})" if resource_name else "") + f" | ARM: {arm_type}" + (f" | Category: {category}" if category else ""))
+            parts = ["✓ Added: ", service_name]
+            if resource_name:
+                parts += [" (", resource_name, ")"]
+            parts += [" | ARM: ", arm_type]
+            if category:
+                parts += [" | Category: ", category]
+            parts.append("\n")
+            sys.stdout.write("".join(parts))
     
     async def clarify_resources(
         self, 
@@ -837,58 +1286,105 @@ No explanation needed."""
         if not filter_result.needs_clarification:
             return []
         
+        # Equivalent icons (same type at the same rounded position) are asked
+        # about once; order maps each input icon to its unique icon's response
+        icons: List[DetectedIcon] = []
+        slots: dict[tuple[str, int, int], int] = {}
+        order = []
+        for icon in filter_result.needs_clarification:
+            key = (icon.type, round(icon.position.x), round(icon.position.y))
+            if key not in slots:
+                slots[key] = len(icons)
+                icons.append(icon)
+            order.append(slots[key])
+        
         responses = []
         
-        for icon in filter_result.needs_clarification:
-            # Generate clarification question
-            request = await self._generate_question(icon)
-            
-            # Get user response
-            user_answer = await self.input_handler(
-                request.question,
-                request.options,
-            )
-            
-            # Process the response
-            response = await self._process_response(icon, user_answer, request)
-            responses.append(response)
+        # Build every clarification question before the first prompt
+        requests = [self._build_question(icon) for icon in icons]
+        
+        # Lookups for the current icon's service options run while the user
+        # is answering; picking an option then joins (or finds the result of)
+        # its lookup instead of starting a new run
+        prefetch: dict[str, asyncio.Task] = {}
         
-        return responses
+        try:
+            for icon, request in zip(icons, requests):
+                # Leftover lookups from the previous icon are not needed any
+                # more, unless this icon offers the same option
+                self._cancel_prefetch(prefetch, keep=self._option_keys(icon))
+                self._prefetch_lookups(icon, prefetch)
+                
+                # Get user response
+                user_answer = await self.input_handler(
+                    request.question,
+                    request.options,
+                )
+                
+                # Process the response
+                response = await self._process_response(icon, user_answer, request)
+                responses.append(response)
+        finally:
+            self._cancel_prefetch(prefetch)
+        
+        return [responses[slot] for slot in order]
     
-    async def _generate_question(self, icon: DetectedIcon) -> ClarificationRequest:
-        """Generate a clarification question for an uncertain resource."""
-        if not self._client or not self._agent_id:
-            raise RuntimeError("Agent not initialized. Use async context manager.")
+    @staticmethod
+    def _option_keys(icon: DetectedIcon) -> set[str]:
+        """Lookup keys of an icon's clarification options."""
+        return {option.strip().lower() for option in icon.clarification_options or []}
+    
+    def _prefetch_lookups(self, icon: DetectedIcon, tasks: dict[str, asyncio.Task]) -> None:
+        """Start lookups for an icon's clarification options not already cached or running."""
+        for option in icon.clarification_options or []:
+            key = option.strip().lower()
+            if key and key not in tasks and key not in self._arm_cache:
+                tasks[key] = asyncio.create_task(self._suggest_all(option, count=0))
+    
+    def _cancel_prefetch(self, tasks: dict[str, asyncio.Task], keep: Iterable[str] = ()) -> None:
+        """Cancel prefetched lookups (except ``keep``) and drop them from ``tasks``.
         
+        The shared lookup run is cancelled too, so its thread is retired
+        (see ``_run_lookup``) instead of finishing a reply nobody reads.
+        """
+        keep = set(keep)
+        for key in [key for key in tasks if key not in keep]:
+            task = tasks.pop(key)
+            if task.done():
+                continue
+            task.cancel()
+            in_flight = self._lookups_in_flight.get((key, 0))
+            if in_flight is not None:
+                in_flight.cancel()
+    
+    def _build_question(self, icon: DetectedIcon) -> ClarificationRequest:
+        """Build the clarification question for an uncertain resource from its fields."""
         # Determine clarification type
         if icon.needs_clarification and icon.clarification_options:
             clarification_type = ClarificationType.MULTIPLE_OPTIONS
-            options = icon.clarification_options + ["Enter custom type", "Skip for now"]
         elif icon.confidence < 0.5:
             clarification_type = ClarificationType.UNKNOWN_ICON
-            options = ["Keep as detected", "Remove from analysis", "Enter custom type", "Skip for now"]
         elif icon.confidence < 0.7:
             clarification_type = ClarificationType.LOW_CONFIDENCE
-            options = [
-                f"Yes, this is {icon.type}",
-                "No, this is a different service",
-                "Remove from analysis",
-                "Enter custom type",
-                "Skip for now",
-            ]
         else:
             clarification_type = ClarificationType.AMBIGUOUS_TYPE
-            options = ["Keep as detected", "Specify different type", "Remove", "Enter custom type", "Skip for now"]
         
-        # Build question based on type
+        # Fill in the question and options for that type
+        template, option_templates = _CLARIFICATION_PROMPTS[clarification_type]
+        fields = {
+            "type": icon.type,
+            "name": icon.name or icon.type,
+            "x": icon.position.x,
+            "y": icon.position.y,
+            "confidence": icon.display_confidence,
+        }
+        question = template.format_map(fields)
+        options = [
+            option.format_map(fields) if "{" in option else option
+            for option in option_templates
+        ]
         if clarification_type == ClarificationType.MULTIPLE_OPTIONS:
-            question = f"The detected icon '{icon.type}' could be one of several services. Which is correct?"
-        elif clarification_type == ClarificationType.UNKNOWN_ICON:
-            question = f"Could not identify the icon at position ({icon.position.x:.0f}, {icon.position.y:.0f}). What should we do?"
-        elif clarification_type == ClarificationType.LOW_CONFIDENCE:
-            question = f"Is '{icon.type}' correctly identified? (confidence: {icon.confidence:.0%})"
-        else:
-            question = f"Please confirm the service type for '{icon.name or icon.type}':"
+            options = icon.clarification_options + options
         
         return ClarificationRequest(
             resource=icon,
@@ -904,222 +1400,8 @@ No explanation needed."""
         request: ClarificationRequest,
     ) -> ClarificationResponse:
         """Process the user's response and determine action."""
-        user_lower = user_answer.lower()
-        
-        # Check if user entered a custom ARM type directly (contains "Microsoft." or "/" pattern)
-        is_arm_type = "microsoft." in user_lower or "/" in user_answer
-        
-        # Determine action
-        if "skip" in user_lower:
-            # Skip for now - keep original with clarification flag
-            action = "KEEP"
-            updated_icon = icon
-        elif "remove" in user_lower:
-            action = "REMOVE"
-            updated_icon = None
-        elif "enter custom" in user_lower or is_arm_type:
-            # User wants to enter custom type OR already entered ARM type
-            action = "UPDATE"
-            
-            if is_arm_type:
-                # User already provided ARM type directly
-                new_arm_type = user_answer.strip()
-                new_type = icon.type  # Keep original service type
-            else:
-                # Ask for custom ARM type
-                new_arm_type = await self.input_handler(
-                    f"Enter ARM type for '{icon.type}' (e.g., Microsoft.CognitiveServices/accounts):",
-                    []  # Free-form input
-                )
-                
-                if not new_arm_type.strip() or "skip" in new_arm_type.lower():
-                    action = "KEEP"
-                    updated_icon = icon
-                    return ClarificationResponse(
-                        original_resource=icon,
-                        clarified_type=icon.type,
-                        clarified_arm_type=icon.arm_resource_type,
-                        clarified_name=icon.name,
-                        should_include=True,
-                        user_notes=user_answer,
-                    )
-                
-                new_type = icon.type  # Keep original service type
-            
-            # Ask for category
-            category_input = await self.input_handler(
-                f"Resource category (e.g., Compute, AI/ML, Storage, Networking):",
-                ["Unknown"]
-            )
-            category = category_input.strip() if category_input.strip() and "unknown" not in category_input.lower() else icon.resource_category
-            
-            updated_icon = DetectedIcon(
-                type=new_type,
-                name=icon.name,
-                position=icon.position,
-                confidence=1.0,
-                arm_resource_type=new_arm_type,
-                resource_category=category,
-                connections=icon.connections,
-                needs_clarification=False,
-                clarification_options=[],
-            )
-        elif "keep" in user_lower or "yes" in user_lower:
-            action = "KEEP"
-            # Check if ARM type is Unknown - ask user to provide it
-            if not icon.arm_resource_type or icon.arm_resource_type == "Unknown":
-                arm_type_input = await self.input_handler(
-                    f"ARM type for '{icon.type}' is unknown. Please provide ARM type (e.g., Microsoft.Web/sites) or 'skip' to remove:",
-                    ["skip"]
-                )
-                if "skip" in arm_type_input.lower() or not arm_type_input.strip():
-                    action = "REMOVE"
-                    updated_icon = None
-                else:
-                    # Ask for category as well
-                    category_input = await self.input_handler(
-                        f"Resource category for '{icon.type}' (e.g., Compute, Networking, AI/ML, Storage):",
-                        ["Unknown"]
-                    )
-                    category = category_input.strip() if category_input.strip() and "unknown" not in category_input.lower() else icon.resource_category
-                    
-                    updated_icon = DetectedIcon(
-                        type=icon.type,
-                        name=icon.name,
-                        position=icon.position,
-                        confidence=icon.confidence,
-                        arm_resource_type=arm_type_input.strip(),
-                        resource_category=category,
-                        connections=icon.connections,
-                        needs_clarification=False,
-                        clarification_options=[],
-                    )
-            else:
-                updated_icon = icon
-        elif "different" in user_lower or "specify" in user_lower:
-            action = "UPDATE"
-            
-            # For Unknown ARM type resources, ask for ARM type directly (not service type)
-            if not icon.arm_resource_type or icon.arm_resource_type.lower() == "unknown":
-                arm_type_input = await self.input_handler(
-                    f"Enter ARM type for '{icon.type}' (e.g., Microsoft.CognitiveServices/accounts) or 'skip' to remove:",
-                    ["skip"]
-                )
-                
-                if "skip" in arm_type_input.lower() or not arm_type_input.strip():
-                    action = "KEEP"
-                    updated_icon = icon
-                else:
-                    # User provided ARM type - keep original service type
-                    new_arm_type = arm_type_input.strip()
-                    new_type = icon.type  # Keep original service type
-                    
-                    # Ask for category
-                    category_input = await self.input_handler(
-                        f"Resource category for '{icon.type}' (e.g., Compute, AI/ML, Storage, Networking):",
-                        ["Unknown"]
-                    )
-                    category = category_input.strip() if category_input.strip() and "unknown" not in category_input.lower() else icon.resource_category
-                    
-                    updated_icon = DetectedIcon(
-                        type=new_type,
-                        name=icon.name,
-                        position=icon.position,
-                        confidence=1.0,
-                        arm_resource_type=new_arm_type,
-                        resource_category=category,
-                        connections=icon.connections,
-                        needs_clarification=False,
-                        clarification_options=[],
-                    )
-            else:
-                # ARM type is known - user wants to change the service type itself
-                new_type = await self.input_handler(
-                    f"What is the correct Azure service type for '{icon.type}'?",
-                    []  # Free-form input
-                )
-                
-                # Validate input
-                if not new_type.strip() or new_type.lower() in ["skip", "cancel", "remove"]:
-                    action = "REMOVE"
-                    updated_icon = None
-                else:
-                    new_type = new_type.strip()
-                    
-                    # Resolve ARM type using tools
-                    new_arm_type = await self._suggest_arm_type(new_type)
-                    new_category = await self._suggest_category(new_type)
-                
-                    # If tools couldn't resolve, ask user
-                    if not new_arm_type or new_arm_type == "Unknown":
-                        arm_type_input = await self.input_handler(
-                            f"Could not resolve ARM type for '{new_type}'. Please provide ARM type (e.g., Microsoft.CognitiveServices/accounts) or 'skip' to remove:",
-                            ["skip"]
-                        )
-                        if "skip" in arm_type_input.lower() or not arm_type_input.strip():
-                            action = "REMOVE"
-                            updated_icon = None
-                        else:
-                            new_arm_type = arm_type_input.strip()
-                    
-                    # Create updated icon if not removed
-                    if action != "REMOVE":
-                        updated_icon = DetectedIcon(
-                            type=new_type,
-                            name=icon.name,
-                            position=icon.position,
-                            confidence=1.0,
-                            arm_resource_type=new_arm_type,
-                            resource_category=new_category or icon.resource_category,
-                            connections=icon.connections,
-                            needs_clarification=False,
-                            clarification_options=[],
-                        )
-                    else:
-                        updated_icon = None
-        else:
-            # User selected a specific option
-            action = "UPDATE"
-            new_service_type = user_answer if user_answer else icon.type
-            
-            # Resolve ARM type using tools
-            new_arm_type = await self._suggest_arm_type(new_service_type)
-            new_category = await self._suggest_category(new_service_type)
-            
-            # If tools couldn't resolve, ask user
-            if not new_arm_type or new_arm_type == "Unknown":
-                arm_type_input = await self.input_handler(
-                    f"Could not resolve ARM type for '{new_service_type}'. Please provide ARM type (e.g., Microsoft.Storage/storageAccounts) or 'skip' to remove:",
-                    ["skip"]
-                )
-                if "skip" in arm_type_input.lower() or not arm_type_input.strip():
-                    action = "REMOVE"
-                    updated_icon = None
-                else:
-                    new_arm_type = arm_type_input.strip()
-                    
-                    # Ask for category if not resolved
-                    if not new_category:
-                        category_input = await self.input_handler(
-                            f"Resource category for '{new_service_type}' (e.g., Compute, Networking, AI/ML, Storage):",
-                            ["Unknown"]
-                        )
-                        new_category = category_input.strip() if category_input.strip() and "unknown" not in category_input.lower() else icon.resource_category
-            
-            if action != "REMOVE":
-                updated_icon = DetectedIcon(
-                    type=new_service_type,
-                    name=icon.name,
-                    position=icon.position,
-                    confidence=1.0,
-                    arm_resource_type=new_arm_type,
-                    resource_category=new_category or icon.resource_category,
-                    connections=icon.connections,
-                    needs_clarification=False,
-                    clarification_options=[],
-                )
-            else:
-                updated_icon = None
+        handler = self._CLARIFY_HANDLERS[_classify_answer(user_answer)]
+        action, updated_icon = await handler(self, icon, user_answer)
         
         return ClarificationResponse(
             original_resource=icon,
@@ -1129,3 +1411,188 @@ No explanation needed."""
             should_include=(action != "REMOVE"),
             user_notes=user_answer,
         )
+    
+    async def _ask_arm_type(self, question: str) -> Optional[str]:
+        """Ask for an ARM type; None when the user skips."""
+        answer = await self.input_handler(question, ["skip"])
+        return None if _is_skip_answer(answer) else answer.strip()
+    
+    async def _ask_category(self, question: str, default: Optional[str]) -> Optional[str]:
+        """Ask for a resource category; default when left blank or 'unknown'."""
+        return _answer_or(await self.input_handler(question, ["Unknown"]), default)
+    
+    async def _clarify_skip(
+        self, icon: DetectedIcon, user_answer: str
+    ) -> tuple[str, Optional[DetectedIcon]]:
+        """Skip for now - keep original with clarification flag."""
+        return "KEEP", icon
+    
+    async def _clarify_remove(
+        self, icon: DetectedIcon, user_answer: str
+    ) -> tuple[str, Optional[DetectedIcon]]:
+        """Exclude the resource from analysis."""
+        return "REMOVE", None
+    
+    async def _clarify_custom(
+        self, icon: DetectedIcon, user_answer: str
+    ) -> tuple[str, Optional[DetectedIcon]]:
+        """User wants to enter custom type OR already entered ARM type."""
+        if _ARM_TYPE_HINT.search(user_answer):
+            # User already provided ARM type directly
+            new_arm_type = user_answer.strip()
+        else:
+            # Ask for custom ARM type
+            new_arm_type = await self.input_handler(
+                f"Enter ARM type for '{icon.type}' (e.g., Microsoft.CognitiveServices/accounts):",
+                []  # Free-form input
+            )
+            
+            if _is_skip_answer(new_arm_type):
+                return "KEEP", icon
+        
+        # Ask for category
+        category = await self._ask_category(
+            "Resource category (e.g., Compute, AI/ML, Storage, Networking):",
+            icon.resource_category,
+        )
+        
+        return "UPDATE", icon.model_copy(update={
+            "confidence": 1.0,
+            "arm_resource_type": new_arm_type,
+            "resource_category": category,
+            "needs_clarification": False,
+            "clarification_options": [],
+        })
+    
+    async def _clarify_keep(
+        self, icon: DetectedIcon, user_answer: str
+    ) -> tuple[str, Optional[DetectedIcon]]:
+        """Keep as detected, asking for the ARM type if it is unknown."""
+        if not _is_unknown(icon.arm_resource_type):
+            return "KEEP", icon
+        
+        arm_type = await self._ask_arm_type(
+            f"ARM type for '{icon.type}' is unknown. Please provide ARM type (e.g., Microsoft.Web/sites) or 'skip' to remove:"
+        )
+        if arm_type is None:
+            return "REMOVE", None
+        
+        # Ask for category as well
+        category = await self._ask_category(
+            f"Resource category for '{icon.type}' (e.g., Compute, Networking, AI/ML, Storage):",
+            icon.resource_category,
+        )
+        
+        return "KEEP", icon.model_copy(update={
+            "arm_resource_type": arm_type,
+            "resource_category": category,
+            "needs_clarification": False,
+            "clarification_options": [],
+        })
+    
+    async def _clarify_different(
+        self, icon: DetectedIcon, user_answer: str
+    ) -> tuple[str, Optional[DetectedIcon]]:
+        """User says this is a different service."""
+        # For Unknown ARM type resources, ask for ARM type directly (not service type)
+        if _is_unknown(icon.arm_resource_type):
+            new_arm_type = await self._ask_arm_type(
+                f"Enter ARM type for '{icon.type}' (e.g., Microsoft.CognitiveServices/accounts) or 'skip' to remove:"
+            )
+            if new_arm_type is None:
+                return "KEEP", icon
+            
+            # User provided ARM type - keep original service type; ask for category
+            category = await self._ask_category(
+                f"Resource category for '{icon.type}' (e.g., Compute, AI/ML, Storage, Networking):",
+                icon.resource_category,
+            )
+            
+            return "UPDATE", icon.model_copy(update={
+                "confidence": 1.0,
+                "arm_resource_type": new_arm_type,
+                "resource_category": category,
+                "needs_clarification": False,
+                "clarification_options": [],
+            })
+        
+        # ARM type is known - user wants to change the service type itself
+        new_type = await self.input_handler(
+            f"What is the correct Azure service type for '{icon.type}'?",
+            []  # Free-form input
+        )
+        
+        # Validate input
+        if not new_type.strip() or new_type.lower() in ["skip", "cancel", "remove"]:
+            return "REMOVE", None
+        
+        new_type = new_type.strip()
+        
+        # Resolve ARM type using tools
+        lookup = await self._suggest_all(new_type, count=0)
+        new_arm_type = lookup["arm_resource_type"]
+        new_category = lookup["category"]
+        
+        # If tools couldn't resolve, ask user
+        if _is_unknown(new_arm_type):
+            new_arm_type = await self._ask_arm_type(
+                f"Could not resolve ARM type for '{new_type}'. Please provide ARM type (e.g., Microsoft.CognitiveServices/accounts) or 'skip' to remove:"
+            )
+            if new_arm_type is None:
+                return "REMOVE", None
+        
+        return "UPDATE", icon.model_copy(update={
+            "type": new_type,
+            "confidence": 1.0,
+            "arm_resource_type": new_arm_type,
+            "resource_category": new_category or icon.resource_category,
+            "reasoning": None,  # Described the old service type
+            "needs_clarification": False,
+            "clarification_options": [],
+        })
+    
+    async def _clarify_option(
+        self, icon: DetectedIcon, user_answer: str
+    ) -> tuple[str, Optional[DetectedIcon]]:
+        """User selected a specific service option."""
+        new_service_type = user_answer if user_answer else icon.type
+        
+        # Resolve ARM type using tools
+        lookup = await self._suggest_all(new_service_type, count=0)
+        new_arm_type = lookup["arm_resource_type"]
+        new_category = lookup["category"]
+        
+        # If tools couldn't resolve, ask user
+        if _is_unknown(new_arm_type):
+            new_arm_type = await self._ask_arm_type(
+                f"Could not resolve ARM type for '{new_service_type}'. Please provide ARM type (e.g., Microsoft.Storage/storageAccounts) or 'skip' to remove:"
+            )
+            if new_arm_type is None:
+                return "REMOVE", None
+            
+            # Ask for category if not resolved
+            if not new_category:
+                new_category = await self._ask_category(
+                    f"Resource category for '{new_service_type}' (e.g., Compute, Networking, AI/ML, Storage):",
+                    icon.resource_category,
+                )
+        
+        return "UPDATE", icon.model_copy(update={
+            "type": new_service_type,
+            "confidence": 1.0,
+            "arm_resource_type": new_arm_type,
+            "resource_category": new_category or icon.resource_category,
+            "reasoning": None,  # Described the old service type
+            "needs_clarification": False,
+            "clarification_options": [],
+        })
+    
+    # Answer class (from _classify_answer) -> handler
+    _CLARIFY_HANDLERS = {
+        "skip": _clarify_skip,
+        "remove": _clarify_remove,
+        "custom": _clarify_custom,
+        "keep": _clarify_keep,
+        "different": _clarify_different,
+        "option": _clarify_option,
+    }
@@ -15,21 +15,186 @@ Generates complete, deployment-ready modules with:
 """
 
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field
+import os
+import random
+import re
+import string
+import time
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from pathlib import Path
 
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import MessageRole, ThreadRun, RunStatus
 
+from synthforge.config import get_settings
 from synthforge.agents.tool_setup import create_agent_toolset, get_tool_instructions
 from synthforge.agents.module_mapping_agent import ModuleMapping
-from synthforge.prompts import get_module_development_agent_instructions, get_prompt_template
+from synthforge.prompts import get_module_development_agent_instructions, get_iac_prompt_template
 from synthforge.code_quality_pipeline import CodeQualityPipeline, create_validation_report
 
 logger = logging.getLogger(__name__)
 
+# Module folder names: ARM type segments and service-type words joined by '-'
+_ARM_TYPE_TRANS = str.maketrans({'/': '-'})
+_SERVICE_TYPE_TRANS = str.maketrans({' ': '-', '_': '-'})
+
+# Validation summary counter for each module validation_status
+_STATUS_STAT_KEYS = {
+    "pass": "passed",
+    "warning": "warnings",
+    "fail": "failed",
+    "not_validated": "not_validated",
+}
+
+# FILE: markers start a new file only when they name one of these file types
+_TERRAFORM_FILE_EXTS = ('.tf', '.md', '.example')
+_BICEP_FILE_EXTS = ('.bicep', '.json', '.md')
+_STRIP_PREFIXES = ('modules/', 'deployment/')
+
+# Bump when cached module code must not be reused (e.g. parser/layout changes)
+_MODULE_CACHE_VERSION = 1
+
+
+def _marker_file_path(line: str) -> str:
+    """File path named by a FILE: marker line, relative to the output dir."""
+    file_marker = line.split('FILE:')[1].strip()
+    # Remove any markdown code fence markers
+    file_path = file_marker.split('```')[0].strip()
+    # Strip leading modules/ or deployment/ since base_dir already includes it
+    # (each prefix is a single leading folder, so drop the first path segment)
+    if file_path.startswith(_STRIP_PREFIXES):
+        return file_path.split('/', 1)[1]
+    return file_path
+
+
+def _iter_file_sections(code: str, extensions: Tuple[str, ...]) -> Iterator[Tuple[str, str]]:
+    """Yield (file path, raw content) for each FILE: section of an agent response.
+    
+    A line containing 'FILE:' and one of ``extensions`` starts a new file;
+    its content is every line up to the next such marker, sliced straight
+    out of ``code``. Sections with no lines after the marker are skipped.
+    """
+    current_file = None
+    body_start = None  # offset of the line after the current marker
+    
+    # Only lines containing 'FILE:' are inspected ('\n'-separated, as in code.split('\n'))
+    idx = code.find('FILE:')
+    while idx != -1:
+        line_start = code.rfind('\n', 0, idx) + 1
+        line_end = code.find('\n', idx)
+        if line_end == -1:
+            line_end = len(code)
+        idx = code.find('FILE:', line_end)
+        
+        line = code[line_start:line_end]
+        if not any(ext in line for ext in extensions):
+            # Not a file marker - part of the current file's content
+            continue
+        
+        if current_file and body_start is not None and line_start > body_start:
+            yield current_file, code[body_start:line_start - 1]
+        current_file = _marker_file_path(line)
+        body_start = line_end + 1 if line_end < len(code) else None
+    
+    if current_file and body_start is not None:
+        yield current_file, code[body_start:]
+
+
+# Code fences stripped from generated file contents
+_FENCE_RE = re.compile(r'^```(?:hcl|terraform|bicep)?\s*$', re.MULTILINE)
+_MD_FENCE_LANGS = ('markdown', 'md', '')
+
+
+# Generated files (versions.tf, provider blocks, empty variables files) often
+# repeat across modules, so cleaned results are memoized by content
+@lru_cache(maxsize=128)
+def _clean_code(content: str) -> str:
+    """Remove markdown fences and leading/trailing blank lines from code."""
+    # Remove markdown code fences (```hcl, ```terraform, ```bicep, ```)
+    content = _FENCE_RE.sub('', content)
+    
+    # Remove leading/trailing blank lines (indentation of the first and
+    # last non-blank lines is kept)
+    first_char = len(content) - len(content.lstrip())
+    if first_char == len(content):
+        return ''
+    start = content.rfind('\n', 0, first_char) + 1
+    end = content.find('\n', len(content.rstrip()))
+    return content[start:] if end == -1 else content[start:end]
+
+
+@lru_cache(maxsize=128)
+def _clean_bicep(code: str) -> str:
+    """Extract Bicep code from markdown fences."""
+    start = code.find('```bicep')
+    if start != -1:
+        # Content of the first ```bicep block, up to the next fence (or the
+        # next ```bicep, or the end if unclosed)
+        start += len('```bicep')
+        next_block = code.find('```bicep', start)
+        end = code.find('```', start, len(code) if next_block == -1 else next_block)
+        if end == -1:
+            end = next_block
+    else:
+        # Try to extract first code block (needs an opening and closing fence)
+        start = code.find('```')
+        end = code.find('```', start + 3) if start != -1 else -1
+        if end == -1:
+            return code.strip()
+        start += 3
+    
+    return (code[start:end] if end != -1 else code[start:]).strip()
+
+
+# Locates JSON objects embedded in agent responses (see _parse_bicep_json_response)
+_JSON_DECODER = json.JSONDecoder()
+_JSON_OBJECT_START_RE = re.compile(r'\{\s*"')
+
+# Throttling signatures in agent/run error messages
+_THROTTLE_RE = re.compile(r"429|throttl|rate[ _-]?limit", re.IGNORECASE)
+
+
+def _is_throttled(error: Exception) -> bool:
+    """True if ``error`` is a 429/rate-limit failure."""
+    # HttpResponseError carries the HTTP status; run failures only have a message
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return _THROTTLE_RE.search(str(error)) is not None
+
+
+@lru_cache(maxsize=None)
+def _compile_prompt(template_name: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """Split a prompt template into (literal text, field name) segments once.
+    
+    Returns None if the template uses conversions or format specs, which
+    only str.format handles.
+    """
+    segments = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(
+        get_iac_prompt_template(template_name)
+    ):
+        if format_spec or conversion:
+            return None
+        segments.append((literal, field_name))
+    return tuple(segments)
+
+
+@lru_cache(maxsize=64)
+def _render_prompt(template_name: str, **fields: Optional[str]) -> str:
+    """Render a module generation prompt (memoized - retries re-render identical prompts)."""
+    segments = _compile_prompt(template_name)
+    if segments is None:
+        return get_iac_prompt_template(template_name).format(**fields)
+    return "".join([
+        literal + str(fields[field_name]) if field_name is not None else literal
+        for literal, field_name in segments
+    ])
+
 
 @dataclass
 class GeneratedModule:
@@ -124,11 +289,24 @@ class ModuleDevelopmentAgent:
             ms_learn_mcp_url: MS Learn MCP server URL
         """
         self.agents_client = agents_client
+        self.settings = get_settings()
         self.model_name = model_name
         self.iac_format = iac_format
         self.agent = None
-        self.thread = None
+        # Each generation run gets its own conversation thread (a thread runs
+        # one run at a time); all are kept until cleanup()
+        self.thread_ids: List[str] = []
         self.enable_validation = enable_validation
+        # Agent runs execute in worker threads; the semaphore bounds how many
+        # are in flight at once
+        self._run_semaphore = asyncio.Semaphore(max(1, self.settings.module_max_concurrent_runs))
+        # Validation has its own bound, so modules waiting on validation never
+        # hold a generation slot
+        self._validation_semaphore = asyncio.Semaphore(
+            max(1, self.settings.module_max_concurrent_validations)
+        )
+        # validation_reports.jsonl stream, open for the duration of generate_modules()
+        self._report_file = None
         
         # Initialize code quality pipeline with agent
         if enable_validation:
@@ -182,7 +360,15 @@ class ModuleDevelopmentAgent:
         logger.info(f"✓ {self.AGENT_NAME} initialized (Agent ID: {self.agent.id})")
     
     def _create_agent(self):
-        """Create the Azure AI agent."""
+        """Create the Azure AI agent (or reuse the one kept by an earlier run)."""
+        agent_cache_file = None
+        if self.settings.module_agent_reuse:
+            agent_cache_file = self.settings.module_cache_dir / "agents" / f"{self._get_agent_cache_key()}.json"
+            self.agent = self._load_cached_agent(agent_cache_file)
+            if self.agent:
+                logger.info(f"✓ Reusing agent {self.agent.id} from an earlier run")
+                return
+        
         try:
             logger.info(f"Creating agent with model: {self.model_name}")
             self.agent = self.agents_client.create_agent(
@@ -194,6 +380,8 @@ class ModuleDevelopmentAgent:
             )
             logger.debug(f"Agent created: {self.agent.id}")
             logger.info(f"✓ Agent created successfully with {self.model_name}")
+            if agent_cache_file:
+                self._store_cached_agent(agent_cache_file, self.agent.id)
         except Exception as e:
             logger.error(f"Failed to create agent with model '{self.model_name}': {e}")
             # Try fallback model if configured
@@ -256,10 +444,6 @@ class ModuleDevelopmentAgent:
         # Create output directory
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Create thread
-        self.thread = self.agents_client.threads.create()
-        logger.info(f"Created thread: {self.thread.id}")
-        
         # Initialize CodeQualityAgent ONCE before parallel generation (if validation enabled)
         quality_agent_context = None
         if self.enable_validation and self.validation_pipeline and self.validation_pipeline.quality_agent:
@@ -269,20 +453,32 @@ class ModuleDevelopmentAgent:
             await quality_agent_context  # Enter the context
             logger.info(f"✓ CodeQualityAgent initialized (will be reused for all {len(mappings)} modules)")
         
+        # One validation row per module, appended to a single JSONL file
+        if self.enable_validation and self.validation_pipeline:
+            self._report_file = open(output_dir / "validation_reports.jsonl", "w", encoding="utf-8")
+        
         try:
             # Generate modules IN PARALLEL using multiple concurrent agents
             logger.info(f"\n{'='*80}")
             logger.info("PARALLEL MODULE GENERATION (Stage 4: Reusable Modules Only)")
             logger.info(f"{'='*80}")
-            logger.info(f"Spawning {len(mappings)} concurrent module generation tasks...")
             
-            # Create parallel generation tasks
+            # Mappings that describe the same reusable module (same ARM type,
+            # AVM module and inputs) are generated once and share the result
+            groups: Dict[tuple, List[int]] = {}
+            for i, mapping in enumerate(mappings):
+                groups.setdefault(self._module_key(mapping), []).append(i)
+            logger.info(f"Spawning {len(groups)} concurrent module generation tasks...")
+            if len(groups) < len(mappings):
+                logger.info(f"   ({len(mappings) - len(groups)} mappings share a module with another mapping)")
+            
+            # Create parallel generation tasks (one per distinct module)
             tasks = []
-            for i, mapping in enumerate(mappings, 1):
+            for indices in groups.values():
                 task = self._generate_module_with_retry(
-                    mapping=mapping,
+                    mapping=mappings[indices[0]],
                     output_dir=output_dir,
-                    index=i,
+                    index=indices[0] + 1,
                     total=len(mappings),
                     progress_callback=progress_callback
                 )
@@ -290,9 +486,23 @@ class ModuleDevelopmentAgent:
             
             # Execute all module generations in parallel
             logger.info(f"🚀 Starting parallel generation of {len(tasks)} reusable modules...")
-            generated_modules = await asyncio.gather(*tasks, return_exceptions=True)
+            group_results = await asyncio.gather(*tasks, return_exceptions=True)
+            
+            # One result per mapping, in mapping order
+            generated_modules = [None] * len(mappings)
+            for indices, result in zip(groups.values(), group_results):
+                generated_modules[indices[0]] = result
+                for i in indices[1:]:
+                    generated_modules[i] = (
+                        result if isinstance(result, Exception)
+                        else self._share_module(result, mappings[i])
+                    )
         
         finally:
+            if self._report_file is not None:
+                self._report_file.close()
+                self._report_file = None
+            
             # Cleanup CodeQualityAgent after all modules are generated
             if quality_agent_context is not None:
                 try:
@@ -325,14 +535,16 @@ class ModuleDevelopmentAgent:
         # Validation summary
         validation_summary = {}
         if self.enable_validation:
-            validation_stats = {
-                "passed": len([m for m in successful_modules if m.validation_status == "pass"]),
-                "warnings": len([m for m in successful_modules if m.validation_status == "warning"]),
-                "failed": len([m for m in successful_modules if m.validation_status == "fail"]),
-                "not_validated": len([m for m in successful_modules if m.validation_status == "not_validated"]),
-                "total_errors": sum(m.validation_errors for m in successful_modules),
-                "total_warnings": sum(m.validation_warnings for m in successful_modules),
-            }
+            validation_stats = dict.fromkeys(
+                ("passed", "warnings", "failed", "not_validated", "total_errors", "total_warnings"), 0
+            )
+            for m in successful_modules:
+                # "error" (validation itself crashed) is not counted under any status
+                status_key = _STATUS_STAT_KEYS.get(m.validation_status)
+                if status_key:
+                    validation_stats[status_key] += 1
+                validation_stats["total_errors"] += m.validation_errors
+                validation_stats["total_warnings"] += m.validation_warnings
             
             validation_summary = validation_stats
             
@@ -363,7 +575,7 @@ class ModuleDevelopmentAgent:
             iac_format=self.iac_format,
             output_directory=output_dir,
             agent_id=self.agent.id,
-            thread_id=self.thread.id,
+            thread_id=self.thread_ids[0] if self.thread_ids else None,
             validation_enabled=self.enable_validation,
             validation_summary=validation_summary,
         )
@@ -371,6 +583,33 @@ class ModuleDevelopmentAgent:
         logger.info(f"\n✓ Successfully generated {result.total_count} modules")
         return result
     
+    @staticmethod
+    def _module_key(mapping: ModuleMapping) -> tuple:
+        """Identify the reusable module a mapping generates (mappings with equal keys share one).
+        
+        The folder is part of the key: it is in the prompt and decides where the
+        files are written, so mappings in different folders are generated separately.
+        """
+        requirement = mapping.service_requirement
+        return (
+            requirement.arm_type or requirement.service_type,
+            mapping.folder_path,
+            mapping.module_source,
+            mapping.module_version,
+            tuple(sorted(mapping.required_inputs)),
+            tuple(sorted(mapping.optional_inputs[:10])),
+        )
+    
+    @staticmethod
+    def _share_module(module: GeneratedModule, mapping: ModuleMapping) -> GeneratedModule:
+        """Describe an already generated module (same files) for another mapping."""
+        return replace(
+            module,
+            module_name=mapping.folder_path if mapping.folder_path else mapping.service_requirement.resource_name,
+            variables=mapping.required_inputs,
+            dependencies=mapping.service_requirement.dependencies,
+        )
+    
     async def _generate_module_with_retry(
         self,
         mapping: ModuleMapping,
@@ -381,35 +620,31 @@ class ModuleDevelopmentAgent:
         max_retries: int = 5
     ) -> GeneratedModule:
         """Generate a single module with retry logic and throttle handling."""
-        import time
-        import random
-        
         service_name = mapping.service_requirement.resource_name
-        service_type = mapping.service_requirement.service_type
         arm_type = getattr(mapping.service_requirement, 'arm_type', None)
-        
-        # Extract module folder name from arm_type or fall back to service_type
-        if arm_type:
-            # e.g., Microsoft.ApiManagement/service -> apimanagement-service
-            module_type = arm_type.replace('Microsoft.', '').replace('/', '-').lower()
-        else:
-            # Fallback: use service_type and sanitize
-            module_type = service_type.lower().replace(' ', '-').replace('_', '-')
-            logger.warning(f"   ⚠️  arm_type missing, using service_type: {module_type}")
+        module_type = self._module_type(mapping)
         
         # Calculate progress percentage
         progress_pct = 0.70 + (0.15 * (index - 1) / total)
         
-        logger.info(f"\n📦 [{index}/{total}] Module Type: {module_type}")
-        logger.info(f"   ARM Type: {arm_type}")
-        logger.info(f"   Service: {service_name}")
-        logger.info(f"   AVM Source: {mapping.module_source}")
+        logger.info(
+            f"\n📦 [{index}/{total}] Module Type: {module_type}\n"
+            f"   ARM Type: {arm_type}\n"
+            f"   Service: {service_name}\n"
+            f"   AVM Source: {mapping.module_source}"
+        )
         
         # Progress callback - starting (show module type, not resource name)
         if progress_callback and asyncio.iscoroutinefunction(progress_callback):
             await progress_callback("generating", f"[{index}/{total}] Module: {module_type} - Generating complete reusable module...", progress_pct)
         
-        # Retry loop with exponential backoff
+        # Template values (service JSON, input lists) are the same for every attempt
+        prompt_fields = self._prompt_fields(mapping)
+        
+        # Retry loop with decorrelated jitter backoff: each wait is drawn from
+        # [1s, 3x the previous wait] (capped), so modules throttled together
+        # spread out instead of retrying in lockstep
+        prev_wait, max_wait = 1.0, 60.0
         for attempt in range(max_retries):
             try:
                 module = await self._generate_single_module(
@@ -417,12 +652,16 @@ class ModuleDevelopmentAgent:
                     output_dir=output_dir,
                     index=index,
                     total=total,
-                    progress_callback=progress_callback
+                    progress_callback=progress_callback,
+                    prompt_fields=prompt_fields,
+                    module_type=module_type,
                 )
                 
-                logger.info(f"   ✅ [{index}/{total}] Module: {module_type} complete")
-                logger.info(f"      Path: {module.file_path}")
-                logger.info(f"      Files: main.tf, variables.tf, outputs.tf, README.md")
+                logger.info(
+                    f"   ✅ [{index}/{total}] Module: {module_type} complete\n"
+                    f"      Path: {module.file_path}\n"
+                    f"      Files: main.tf, variables.tf, outputs.tf, README.md"
+                )
                 
                 # Progress callback - completed (show module type)
                 if progress_callback and asyncio.iscoroutinefunction(progress_callback):
@@ -432,15 +671,15 @@ class ModuleDevelopmentAgent:
                 return module
                 
             except Exception as e:
-                error_msg = str(e)
-                
                 # Check if it's a throttling error (429)
-                if "429" in error_msg or "throttl" in error_msg.lower() or "rate limit" in error_msg.lower():
+                if _is_throttled(e):
                     if attempt < max_retries - 1:
-                        # Exponential backoff with jitter
-                        wait_time = (2 ** attempt) + random.uniform(0, 1)
-                        logger.warning(f"   ⏳ [{index}/{total}] Throttled: Module {module_type}")
-                        logger.warning(f"      Cooling down for {wait_time:.1f}s (attempt {attempt+1}/{max_retries})...")
+                        wait_time = min(max_wait, random.uniform(1.0, prev_wait * 3))
+                        prev_wait = wait_time
+                        logger.warning(
+                            f"   ⏳ [{index}/{total}] Throttled: Module {module_type}\n"
+                            f"      Cooling down for {wait_time:.1f}s (attempt {attempt+1}/{max_retries})..."
+                        )
                         await asyncio.sleep(wait_time)
                         continue
                     else:
@@ -448,12 +687,42 @@ class ModuleDevelopmentAgent:
                         raise
                 else:
                     # Non-throttling error - fail immediately
-                    logger.error(f"   ❌ [{index}/{total}] Error: Module {module_type}")
-                    logger.error(f"      {error_msg}")
+                    logger.error(f"   ❌ [{index}/{total}] Error: Module {module_type}\n      {e}")
                     raise
         
         raise Exception(f"Failed to generate module after {max_retries} attempts")
     
+    @staticmethod
+    def _module_type(mapping: ModuleMapping) -> str:
+        """Module folder name from arm_type, falling back to service_type."""
+        arm_type = getattr(mapping.service_requirement, 'arm_type', None)
+        if arm_type:
+            # e.g., Microsoft.ApiManagement/service -> apimanagement-service
+            return arm_type.removeprefix('Microsoft.').translate(_ARM_TYPE_TRANS).lower()
+        # Fallback: use service_type and sanitize
+        module_type = mapping.service_requirement.service_type.translate(_SERVICE_TYPE_TRANS).lower()
+        logger.warning(f"   ⚠️  arm_type missing, using service_type: {module_type}")
+        return module_type
+    
+    def _prompt_fields(self, mapping: ModuleMapping) -> Dict[str, Optional[str]]:
+        """Build the module template values for a mapping."""
+        optional_inputs_str = ', '.join(mapping.optional_inputs[:10]) + ('...' if len(mapping.optional_inputs) > 10 else '')
+        best_practices_str = ', '.join(mapping.best_practices[:5]) + ('...' if len(mapping.best_practices) > 5 else '')
+        return {
+            "iac_format_upper": self.iac_format.upper(),
+            "iac_format": self.iac_format,
+            "service_info_json": json.dumps(mapping.service_requirement.to_dict(), indent=2),
+            "module_source": mapping.module_source,
+            "module_documentation": mapping.module_documentation,
+            "module_version": mapping.module_version,
+            "folder_path": mapping.folder_path if mapping.folder_path else 'modules/resource',
+            "required_inputs": ', '.join(mapping.required_inputs),
+            "optional_inputs": optional_inputs_str,
+            "best_practices": best_practices_str,
+            "arm_type": mapping.service_requirement.arm_type,
+            "service_type": mapping.service_requirement.service_type,
+        }
+    
     async def _generate_single_module(
         self,
         mapping: ModuleMapping,
@@ -461,113 +730,69 @@ class ModuleDevelopmentAgent:
         index: int = 1,
         total: int = 1,
         progress_callback = None,
+        prompt_fields: Optional[Dict[str, Optional[str]]] = None,
+        module_type: Optional[str] = None,
     ) -> GeneratedModule:
-        """Generate a single IaC module."""
-        import json
+        """Generate a single IaC module.
         
+        ``prompt_fields`` (template values from ``_prompt_fields``) and
+        ``module_type`` are passed in by callers that retry, so they are
+        derived once per mapping.
+        """
         # Extract module type for logging and progress callbacks
         service_name = mapping.service_requirement.resource_name
-        service_type = mapping.service_requirement.service_type
-        arm_type = getattr(mapping.service_requirement, 'arm_type', None)
-        
-        # Extract module folder name from arm_type or fall back to service_type
-        if arm_type:
-            # e.g., Microsoft.ApiManagement/service -> apimanagement-service
-            module_type = arm_type.replace('Microsoft.', '').replace('/', '-').lower()
-        else:
-            # Fallback: use service_type and sanitize
-            module_type = service_type.lower().replace(' ', '-').replace('_', '-')
-            logger.warning(f"   ⚠️  arm_type missing, using service_type: {module_type}")
+        if module_type is None:
+            module_type = self._module_type(mapping)
         
         # Calculate progress percentage for validation callbacks
         progress_pct = 0.70 + (0.15 * (index - 1) / total) if total > 0 else 0.70
         
         logger.info(f"Starting module generation for: {service_name}")
-        logger.debug(f"Module type: {module_type}")
-        logger.debug(f"Reference module: {mapping.module_source}")
-        logger.debug(f"IaC format: {self.iac_format}")
+        logger.debug(
+            f"Module type: {module_type}\n"
+            f"Reference module: {mapping.module_source}\n"
+            f"IaC format: {self.iac_format}"
+        )
         
-        # Load prompt template from external file based on IaC format
+        # Prompt template from iac_agent_instructions.yaml based on IaC format
         template_name = f"module_development_{self.iac_format.lower()}"
-        template = get_prompt_template(template_name)
-        
-        # Prepare template variables
-        service_info_json = json.dumps(mapping.service_requirement.to_dict(), indent=2)
-        required_inputs_str = ', '.join(mapping.required_inputs)
-        optional_inputs_str = ', '.join(mapping.optional_inputs[:10]) + ('...' if len(mapping.optional_inputs) > 10 else '')
-        best_practices_str = ', '.join(mapping.best_practices[:5]) + ('...' if len(mapping.best_practices) > 5 else '')
         
         # Format prompt with service-specific values
-        prompt = template.format(
-            iac_format_upper=self.iac_format.upper(),
-            iac_format=self.iac_format,
-            service_info_json=service_info_json,
-            module_source=mapping.module_source,
-            module_documentation=mapping.module_documentation,
-            module_version=mapping.module_version,
-            folder_path=mapping.folder_path if mapping.folder_path else 'modules/resource',
-            required_inputs=required_inputs_str,
-            optional_inputs=optional_inputs_str,
-            best_practices=best_practices_str,
-            arm_type=mapping.service_requirement.arm_type,
-            service_type=mapping.service_requirement.service_type
-        )
+        if prompt_fields is None:
+            prompt_fields = self._prompt_fields(mapping)
+        prompt = _render_prompt(template_name, **prompt_fields)
         
         logger.debug(f"Prompt length: {len(prompt)} characters")
         
-        # Send message
-        logger.info("Sending module generation request to agent...")
-        message = self.agents_client.messages.create(
-            thread_id=self.thread.id,
-            role="user",
-            content=prompt,
-        )
-        logger.debug(f"Message created: {message.id}")
-        
-        # Run agent
-        logger.info("Running agent to generate code...")
-        run = self.agents_client.runs.create_and_process(
-            thread_id=self.thread.id,
-            agent_id=self.agent.id,
-            max_completion_tokens=8000,  # Sufficient for module code generation
-        )
-        
-        logger.info(f"Agent run completed with status: {run.status}")
-        
-        # Check for truncation
-        if run.status == "completed" and hasattr(run, 'incomplete_details') and run.incomplete_details:
-            logger.warning(f"⚠️ Response may be truncated: {run.incomplete_details.reason}")
-            if run.incomplete_details.reason == "max_completion_tokens":
-                logger.error("❌ Module code was truncated due to token limit!")
-        
-        if run.status != "completed":
-            logger.error(f"Module generation failed: {run.status}")
-            if hasattr(run, 'last_error') and run.last_error:
-                logger.error(f"Error details: {run.last_error}")
-            raise RuntimeError(f"Module generation failed: {run.status}")
-        
-        # Get last message from agent (Phase 1 pattern)
-        last_msg = self.agents_client.messages.get_last_message_text_by_role(
-            thread_id=self.thread.id,
-            role=MessageRole.AGENT,
-        )
-        
-        if not last_msg:
-            raise RuntimeError("No response from agent")
-        
-        generated_code = last_msg.text.value
-        
-        # Debug: Save raw response for troubleshooting
-        debug_file = output_dir / "_debug_agent_response.txt"
-        debug_file.write_text(f"=== AGENT RESPONSE START ===\n{generated_code}\n=== AGENT RESPONSE END ===", encoding='utf-8')
-        logger.debug(f"Saved raw agent response to: {debug_file}")
+        # Identical prompts (same service, AVM module, version and template)
+        # for the same agent setup reuse code that passed validation earlier
+        cache_key = self._get_cache_key(prompt) if self.settings.module_cache_enabled else None
+        generated_code = await asyncio.to_thread(self._load_cached_code, cache_key) if cache_key else None
+        from_cache = generated_code is not None
+        if from_cache:
+            logger.info(f"Using cached module code for: {module_type}")
+        else:
+            # Blocking SDK calls run off the event loop so other modules keep
+            # progressing (validation, cache hits, progress callbacks)
+            async with self._run_semaphore:
+                generated_code = await asyncio.to_thread(self._run_generation, prompt)
+        
+        # Debug: Save raw response for troubleshooting (one file per module,
+        # written off the event loop)
+        if logger.isEnabledFor(logging.DEBUG):
+            debug_file = output_dir / f"_debug_{module_type}_{index}.txt"
+            await asyncio.to_thread(
+                debug_file.write_text,
+                f"=== AGENT RESPONSE START ===\n{generated_code}\n=== AGENT RESPONSE END ===",
+                encoding='utf-8',
+            )
+            logger.debug(f"Saved raw agent response to: {debug_file}")
         
         # Parse and save files - now handles both modules/ and deployment/ layers
-        # The agent generates complete folder structure in response
-        if self.iac_format == "terraform":
-            files = self._parse_terraform_files(generated_code, output_dir)
-        else:
-            files = self._parse_bicep_files(generated_code, output_dir)
+        # The agent generates complete folder structure in response.
+        # Parsing and writing run off the event loop
+        saved_files = await asyncio.to_thread(self._save_generated_files, generated_code, output_dir)
+        files = list(saved_files)
         
         # Return first file path as primary (for logging)
         primary_file = files[0] if files else output_dir / "main.tf"
@@ -591,18 +816,19 @@ class ModuleDevelopmentAgent:
                 await progress_callback("validating", f"[{index}/{total}] 🔍 Validating: {module_type}...", progress_pct + 0.02)
             
             try:
-                # Read back the generated files for validation
-                generated_files = {}
-                for file_path in files:
-                    rel_path = file_path.relative_to(module_dir)  # Relative to module_dir, not output_dir
-                    generated_files[str(rel_path)] = file_path.read_text(encoding='utf-8')
+                # Validate the contents the parser just wrote (keyed relative to module_dir, not output_dir)
+                generated_files = {
+                    str(file_path.relative_to(module_dir)): content
+                    for file_path, content in saved_files.items()
+                }
                 
                 # Run validation pipeline (CodeQualityAgent already initialized at module-level)
                 # No need to use async with - agent is shared across all parallel tasks
-                validated_code, validation_result = await self.validation_pipeline.run(
-                    generated_code=generated_files,
-                    output_dir=module_dir
-                )
+                async with self._validation_semaphore:
+                    validated_code, validation_result = await self.validation_pipeline.run(
+                        generated_code=generated_files,
+                        output_dir=module_dir
+                    )
                 
                 validation_status = validation_result.status
                 validation_errors = validation_result.error_count
@@ -623,10 +849,15 @@ class ModuleDevelopmentAgent:
                     if progress_callback and asyncio.iscoroutinefunction(progress_callback):
                         await progress_callback("syntax_errors", f"[{index}/{total}] ⚠️  {validation_errors} syntax errors: {module_type}", progress_pct + 0.04)
                 
-                # Save validation report
-                report_path = module_dir / "validation_report.json"
-                create_validation_report(validation_result, report_path)
-                logger.debug(f"   📄 Validation report: {report_path.name}")
+                # Record the validation report; failed modules also get a
+                # standalone validation_report.json next to their code
+                if self._report_file is not None:
+                    row = {"module": module_path, "module_dir": str(module_dir), **validation_result.to_dict()}
+                    self._report_file.write(json.dumps(row) + "\n")
+                if validation_result.status == "fail":
+                    report_path = module_dir / "validation_report.json"
+                    create_validation_report(validation_result, report_path)
+                    logger.debug(f"   📄 Validation report: {report_path.name}")
                 
             except Exception as e:
                 logger.error(f"   ⚠️  Validation error for {module_dir.name}: {e}")
@@ -634,6 +865,15 @@ class ModuleDevelopmentAgent:
                 if progress_callback and asyncio.iscoroutinefunction(progress_callback):
                     await progress_callback("validation_error", f"[{index}/{total}] ⚠️  Validation error: {module_type}", progress_pct + 0.04)
         
+        # Only code that validated (or was not meant to be validated) is cached;
+        # a cached entry that no longer passes is dropped so the next run regenerates
+        if cache_key:
+            if validation_status in ("pass", "warning", "not_validated"):
+                if not from_cache:
+                    await asyncio.to_thread(self._store_cached_code, cache_key, generated_code)
+            elif from_cache:
+                await asyncio.to_thread(self._discard_cached_code, cache_key)
+        
         return GeneratedModule(
             module_name=module_path,
             iac_format=self.iac_format,
@@ -647,245 +887,298 @@ class ModuleDevelopmentAgent:
             validation_warnings=validation_warnings,
         )
     
-    def _parse_terraform_files(self, code: str, base_dir: Path) -> List[Path]:
-        """Parse and save Terraform files from agent response with full folder structure.
+    def _run_generation(self, prompt: str) -> str:
+        """Run the agent on a new thread and return the generated code."""
+        thread = self.agents_client.threads.create()
+        self.thread_ids.append(thread.id)
+        logger.debug(f"Created thread: {thread.id}")
+        
+        # Send message
+        logger.info("Sending module generation request to agent...")
+        message = self.agents_client.messages.create(
+            thread_id=thread.id,
+            role="user",
+            content=prompt,
+        )
+        logger.debug(f"Message created: {message.id}")
+        
+        # Run agent
+        logger.info("Running agent to generate code...")
+        run = self.agents_client.runs.create_and_process(
+            thread_id=thread.id,
+            agent_id=self.agent.id,
+            max_completion_tokens=8000,  # Sufficient for module code generation
+        )
+        
+        logger.info(f"Agent run completed with status: {run.status}")
+        
+        # Check for truncation
+        if run.status == "completed" and hasattr(run, 'incomplete_details') and run.incomplete_details:
+            logger.warning(f"⚠️ Response may be truncated: {run.incomplete_details.reason}")
+            if run.incomplete_details.reason == "max_completion_tokens":
+                logger.error("❌ Module code was truncated due to token limit!")
+        
+        if run.status != "completed":
+            logger.error(f"Module generation failed: {run.status}")
+            if hasattr(run, 'last_error') and run.last_error:
+                logger.error(f"Error details: {run.last_error}")
+            raise RuntimeError(f"Module generation failed: {run.status}")
+        
+        # Get last message from agent (Phase 1 pattern)
+        last_msg = self.agents_client.messages.get_last_message_text_by_role(
+            thread_id=thread.id,
+            role=MessageRole.AGENT,
+        )
+        
+        if not last_msg:
+            raise RuntimeError("No response from agent")
+        
+        return last_msg.text.value
+    
+    def _get_agent_cache_key(self) -> str:
+        """Build the agent reuse key from everything the agent is created with."""
+        tools = json.dumps(
+            [self.tool_config.tools, self.tool_config.tool_resources], default=str, sort_keys=True
+        )
+        payload = f"{self.model_name}\n{self.iac_format}\n{tools}\n{self.full_instructions}".encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _load_cached_agent(self, cache_file: Path):
+        """Fetch the agent kept by an earlier run, or None if it is gone."""
+        try:
+            agent_id = json.loads(cache_file.read_text(encoding="utf-8")).get("agent_id")
+        except (OSError, ValueError, AttributeError):
+            return None
+        if not agent_id:
+            return None
+        
+        try:
+            return self.agents_client.get_agent(agent_id)
+        except Exception as e:
+            # Deleted or inaccessible - create a new agent instead
+            logger.debug(f"Cached agent {agent_id} unavailable: {e}")
+            return None
+    
+    def _store_cached_agent(self, cache_file: Path, agent_id: str) -> None:
+        """Record the agent id for later runs (written atomically, best-effort)."""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(".tmp")
+            tmp_file.write_text(json.dumps({"agent_id": agent_id}), encoding="utf-8")
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+    
+    def _get_cache_key(self, prompt: str) -> str:
+        """Build the response cache key from the agent setup and full prompt.
+        
+        The agent key covers the model, IaC format, tools and full instructions,
+        so editing iac_agent_instructions.yaml invalidates earlier entries.
+        """
+        payload = f"{_MODULE_CACHE_VERSION}\n{self._get_agent_cache_key()}\n{prompt}".encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _load_cached_code(self, cache_key: str) -> Optional[str]:
+        """Look up generated module code stored by an earlier run (None if missing or expired)."""
+        cache_file = self.settings.module_cache_dir / f"{cache_key}.json"
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            # Missing or unreadable/corrupt entry - treat as a miss, it is rewritten after the run
+            return None
+        if not isinstance(data, dict):
+            return None
+        
+        ttl = self.settings.module_cache_ttl_seconds
+        created = data.get("created")
+        if ttl > 0 and (not isinstance(created, (int, float)) or time.time() - created > ttl):
+            return None
+        
+        content = data.get("content")
+        return content if isinstance(content, str) and content else None
+    
+    def _store_cached_code(self, cache_key: str, generated_code: str) -> None:
+        """Store generated module code on disk for later runs."""
+        try:
+            self.settings.module_cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self.settings.module_cache_dir / f"{cache_key}.json"
+            cache_file.write_text(
+                json.dumps({"created": time.time(), "content": generated_code}), encoding="utf-8"
+            )
+        except OSError:
+            # Cache is best-effort - never fail module generation on a write error
+            pass
+    
+    def _discard_cached_code(self, cache_key: str) -> None:
+        """Remove a cached entry whose code no longer passes validation."""
+        try:
+            (self.settings.module_cache_dir / f"{cache_key}.json").unlink(missing_ok=True)
+        except OSError:
+            pass
+    
+    def _parse_terraform_files(self, code: str, base_dir: Path) -> Dict[Path, str]:
+        """Parse Terraform files from agent response with full folder structure.
         
         Expected format:
         # FILE: modules/cognitive-services-account/main.tf
         # FILE: environments/dev/main.tf
+        
+        Returns the files in order, mapped to their cleaned content
+        (written by ``_write_files``).
         """
-        saved_files = []
-        
-        # Simple parser to extract files with paths
-        current_file = None
-        current_content = []
-        
-        for line in code.split('\n'):
-            if 'FILE:' in line and '.tf' in line:
-                # Save previous file
-                if current_file and current_content:
-                    # Clean content: remove code fences and empty lines at start/end
-                    cleaned_content = self._clean_code_content(current_content)
-                    file_path = base_dir / current_file
-                    file_path.parent.mkdir(parents=True, exist_ok=True)
-                    file_path.write_text(cleaned_content, encoding='utf-8')
-                    saved_files.append(file_path)
-                    logger.debug(f"  Saved: {current_file}")
-                
-                # Start new file - extract full path (e.g., "modules/storage/main.tf")
-                file_marker = line.split('FILE:')[1].strip()
-                # Remove any markdown code fence markers
-                current_file = file_marker.split('```')[0].strip()
-                # Strip leading modules/ or deployment/ since base_dir already includes it
-                if current_file.startswith('modules/'):
-                    current_file = current_file[len('modules/'):]
-                elif current_file.startswith('deployment/'):
-                    current_file = current_file[len('deployment/'):]
-                current_content = []
-            elif 'FILE:' in line and '.md' in line:
-                # Handle README.md files
-                if current_file and current_content:
-                    cleaned_content = self._clean_markdown_content(current_content)
-                    file_path = base_dir / current_file
-                    file_path.parent.mkdir(parents=True, exist_ok=True)
-                    file_path.write_text(cleaned_content, encoding='utf-8')
-                    saved_files.append(file_path)
-                    logger.debug(f"  Saved: {current_file}")
-                
-                file_marker = line.split('FILE:')[1].strip()
-                current_file = file_marker.split('```')[0].strip()
-                # Strip leading modules/ or deployment/
-                if current_file.startswith('modules/'):
-                    current_file = current_file[len('modules/'):]
-                elif current_file.startswith('deployment/'):
-                    current_file = current_file[len('deployment/'):]
-                current_content = []
-            elif 'FILE:' in line and '.example' in line:
-                # Handle .example files like terraform.tfvars.example
-                if current_file and current_content:
-                    cleaned_content = self._clean_code_content(current_content)
-                    file_path = base_dir / current_file
-                    file_path.parent.mkdir(parents=True, exist_ok=True)
-                    file_path.write_text(cleaned_content, encoding='utf-8')
-                    saved_files.append(file_path)
-                    logger.debug(f"  Saved: {current_file}")
-                
-                file_marker = line.split('FILE:')[1].strip()
-                current_file = file_marker.split('```')[0].strip()
-                # Strip leading modules/ or deployment/
-                if current_file.startswith('modules/'):
-                    current_file = current_file[len('modules/'):]
-                elif current_file.startswith('deployment/'):
-                    current_file = current_file[len('deployment/'):]
-                current_content = []
-            elif current_file:
-                # Skip marker lines but keep all content
-                current_content.append(line)
-        
-        # Save last file
-        if current_file and current_content:
-            if current_file.endswith('.md'):
-                cleaned_content = self._clean_markdown_content(current_content)
-            else:
-                cleaned_content = self._clean_code_content(current_content)
-            file_path = base_dir / current_file
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(cleaned_content, encoding='utf-8')
-            saved_files.append(file_path)
-            logger.debug(f"  Saved: {current_file}")
+        parsed_files = self._parse_file_sections(
+            code, base_dir, _TERRAFORM_FILE_EXTS, self._clean_code_content
+        )
         
         # If no files detected, save as single main.tf in modules/ subdirectory
-        if not saved_files:
-            fallback_path = base_dir / "modules" / "default" / "main.tf"
-            fallback_path.parent.mkdir(parents=True, exist_ok=True)
-            fallback_path.write_text(code, encoding='utf-8')
-            saved_files.append(fallback_path)
-            logger.debug(f"  Saved: modules/default/main.tf (fallback)")
+        if not parsed_files:
+            parsed_files[base_dir / "modules" / "default" / "main.tf"] = code
+            logger.debug("  Using modules/default/main.tf (fallback)")
         
-        return saved_files
+        return parsed_files
     
-    def _clean_code_content(self, lines: List[str]) -> str:
-        """Clean code content by removing markdown fences and normalizing whitespace."""
-        content = '\n'.join(lines)
-        
-        # Remove markdown code fences (```hcl, ```terraform, ```bicep, ```)
-        import re
-        content = re.sub(r'^```(?:hcl|terraform|bicep)?\s*$', '', content, flags=re.MULTILINE)
-        content = re.sub(r'^```\s*$', '', content, flags=re.MULTILINE)
-        
-        # Split back into lines and remove leading/trailing empty lines
-        clean_lines = content.split('\n')
-        
-        # Remove leading empty lines
-        while clean_lines and not clean_lines[0].strip():
-            clean_lines.pop(0)
+    def _parse_file_sections(
+        self,
+        code: str,
+        base_dir: Path,
+        extensions: Tuple[str, ...],
+        clean_code: Callable[[str], str],
+        skip_empty: bool = False,
+    ) -> Dict[Path, str]:
+        """Split the response on FILE: markers and clean each file.
+        
+        Shared by the Terraform and Bicep parsers: ``.md`` files get the
+        markdown cleaner, everything else ``clean_code``. With
+        ``skip_empty``, files that are empty after cleaning are dropped.
+        """
+        parsed_files: Dict[Path, str] = {}
         
-        # Remove trailing empty lines
-        while clean_lines and not clean_lines[-1].strip():
-            clean_lines.pop()
+        for current_file, content in _iter_file_sections(code, extensions):
+            # Clean content: remove code fences and empty lines at start/end
+            if current_file.endswith('.md'):
+                cleaned_content = self._clean_markdown_content(content)
+            else:
+                cleaned_content = clean_code(content)
+            
+            if skip_empty and not cleaned_content.strip():
+                logger.warning("  Skipped: %s (empty after cleaning)", current_file)
+                continue
+            parsed_files[base_dir / current_file] = cleaned_content
         
-        return '\n'.join(clean_lines)
+        return parsed_files
     
-    def _clean_markdown_content(self, lines: List[str]) -> str:
+    def _save_generated_files(self, code: str, base_dir: Path) -> Dict[Path, str]:
+        """Parse the agent response for this IaC format and write the files."""
+        if self.iac_format == "terraform":
+            files = self._parse_terraform_files(code, base_dir)
+        else:
+            files = self._parse_bicep_files(code, base_dir)
+        self._write_files(files)
+        return files
+    
+    @staticmethod
+    def _write_files(files: Dict[Path, str]) -> None:
+        """Write parsed files, creating each directory once."""
+        for directory in {file_path.parent for file_path in files}:
+            directory.mkdir(parents=True, exist_ok=True)
+        for file_path, content in files.items():
+            # Bytes skip the text-mode encoder; files keep the agent's '\n' line endings
+            file_path.write_bytes(content.encode('utf-8'))
+            logger.debug("  Saved: %s (%d bytes)", file_path, len(content))
+    
+    def _clean_code_content(self, content: str) -> str:
+        """Clean code content by removing markdown fences and normalizing whitespace."""
+        return _clean_code(content)
+    
+    def _clean_markdown_content(self, content: str) -> str:
         """Clean markdown content by normalizing whitespace but preserving formatting."""
-        content = '\n'.join(lines)
-        
         # For markdown, only remove code fences if they're wrapping the entire content
-        import re
-        content = re.sub(r'^```(?:markdown|md)?\s*\n', '', content)
-        content = re.sub(r'\n```\s*$', '', content)
+        if content.startswith('```'):
+            for lang in _MD_FENCE_LANGS:
+                if content.startswith(lang, 3):
+                    # Opening fence runs through the last newline after the language tag
+                    rest = content[3 + len(lang):]
+                    blank = len(rest) - len(rest.lstrip())
+                    newline = rest.rfind('\n', 0, blank)
+                    if newline != -1:
+                        content = rest[newline + 1:]
+                        break
+        
+        content = content.rstrip()
+        if content.endswith('\n```'):
+            content = content[:-4]
         
         # Remove leading/trailing whitespace but preserve internal structure
         return content.strip()
     
-    def _parse_bicep_files(self, code: str, base_dir: Path) -> List[Path]:
-        """Parse and save Bicep files from agent response with full folder structure.
+    def _parse_bicep_files(self, code: str, base_dir: Path) -> Dict[Path, str]:
+        """Parse Bicep files from agent response with full folder structure.
         
         Expected format:
         # FILE: modules/cognitive-services-account/main.bicep
         # FILE: environments/dev/main.bicep
-        """
-        saved_files = []
         
-        # Log first 500 chars for debugging
-        logger.debug(f"Parsing Bicep response (first 500 chars): {code[:500]}")
-        
-        # Simple parser for Bicep files
-        current_file = None
-        current_content = []
+        Returns the files in order, mapped to their cleaned content
+        (written by ``_write_files``).
+        """
+        # Log first 500 chars for debugging (slice only when DEBUG is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parsing Bicep response (first 500 chars): %s", code[:500])
         
-        for line in code.split('\n'):
-            # Look for FILE: markers (with or without #)
-            if 'FILE:' in line and ('.bicep' in line or '.json' in line or '.md' in line):
-                # Save previous file
-                if current_file and current_content:
-                    self._save_bicep_file(base_dir, current_file, current_content, saved_files)
-                
-                # Start new file - extract full path
-                file_marker = line.split('FILE:')[1].strip()
-                current_file = file_marker.split('```')[0].strip()
-                # Strip leading modules/ or deployment/ since base_dir already includes it
-                if current_file.startswith('modules/'):
-                    current_file = current_file[len('modules/'):]
-                elif current_file.startswith('deployment/'):
-                    current_file = current_file[len('deployment/'):]
-                current_content = []
-            elif current_file:
-                current_content.append(line)
-        
-        # Save last file
-        if current_file and current_content:
-            self._save_bicep_file(base_dir, current_file, current_content, saved_files)
+        # FILE: markers may come with or without #
+        parsed_files = self._parse_file_sections(
+            code, base_dir, _BICEP_FILE_EXTS, self._clean_bicep_code, skip_empty=True
+        )
         
         # If no files detected with FILE: markers, try to detect JSON structure
-        if not saved_files:
+        if not parsed_files:
             logger.warning("No FILE: markers found, attempting JSON parse...")
-            saved_files = self._parse_bicep_json_response(code, base_dir)
+            parsed_files = self._parse_bicep_json_response(code, base_dir)
         
         # Final fallback: save as single main.bicep
-        if not saved_files:
+        if not parsed_files:
             logger.warning("No structured response detected, using fallback...")
             cleaned_code = self._clean_bicep_code(code)
             if cleaned_code.strip():
-                fallback_path = base_dir / "modules" / "default" / "main.bicep"
-                fallback_path.parent.mkdir(parents=True, exist_ok=True)
-                fallback_path.write_text(cleaned_code, encoding='utf-8')
-                saved_files.append(fallback_path)
-                logger.debug(f"  Saved: modules/default/main.bicep (fallback)")
-        
-        return saved_files
-    
-    def _save_bicep_file(self, base_dir: Path, filename: str, content_lines: List[str], saved_files: List[Path]):
-        """Helper to save a Bicep file with content cleaning."""
-        file_path = base_dir / filename
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        content_str = '\n'.join(content_lines)
-        cleaned_content = self._clean_bicep_code(content_str)
-        
-        if cleaned_content.strip():  # Only save if there's actual content
-            file_path.write_text(cleaned_content, encoding='utf-8')
-            saved_files.append(file_path)
-            logger.debug(f"  Saved: {filename} ({len(cleaned_content)} bytes)")
-        else:
-            logger.warning(f"  Skipped: {filename} (empty after cleaning)")
+                parsed_files[base_dir / "modules" / "default" / "main.bicep"] = cleaned_code
+                logger.debug("  Using modules/default/main.bicep (fallback)")
+        
+        return parsed_files
     
     def _clean_bicep_code(self, code: str) -> str:
         """Clean Bicep code by removing markdown fences."""
-        if '```bicep' in code:
-            code = code.split('```bicep')[1].split('```')[0]
-        elif '```' in code:
-            # Try to extract first code block
-            parts = code.split('```')
-            if len(parts) >= 3:
-                code = parts[1]
-        
-        return code.strip()
+        return _clean_bicep(code)
     
-    def _parse_bicep_json_response(self, code: str, base_dir: Path) -> List[Path]:
+    def _parse_bicep_json_response(self, code: str, base_dir: Path) -> Dict[Path, str]:
         """Try to parse response as JSON with files dictionary."""
-        import json
-        import re
-        
-        saved_files = []
+        parsed_files: Dict[Path, str] = {}
         
         try:
-            # Try to find JSON block
-            json_match = re.search(r'\{[\s\S]*"files"[\s\S]*\}', code)
-            if json_match:
-                json_data = json.loads(json_match.group())
-                files_dict = json_data.get('files', {})
-                
+            # Find the first embedded JSON object with a "files" key
+            # (only objects opening with a quoted key, and only before the last "files")
+            files_dict = {}
+            last_files_key = code.rfind('"files"')
+            match = _JSON_OBJECT_START_RE.search(code)
+            while match and match.start() < last_files_key:
+                try:
+                    json_data, _ = _JSON_DECODER.raw_decode(code, match.start())
+                except ValueError:
+                    json_data = None
+                if isinstance(json_data, dict) and 'files' in json_data:
+                    files_dict = json_data['files']
+                    break
+                match = _JSON_OBJECT_START_RE.search(code, match.start() + 1)
+            
+            if files_dict:
                 for filename, content in files_dict.items():
-                    file_path = base_dir / filename
-                    file_path.parent.mkdir(parents=True, exist_ok=True)
-                    file_path.write_text(content, encoding='utf-8')
-                    saved_files.append(file_path)
-                    logger.debug(f"  Saved from JSON: {filename}")
+                    if not isinstance(content, str):
+                        raise TypeError(f"content of {filename} is not text")
+                    parsed_files[base_dir / filename] = content
+                    logger.debug("  Parsed from JSON: %s", filename)
         except Exception as e:
-            logger.debug(f"JSON parse attempt failed: {e}")
+            logger.debug("JSON parse attempt failed: %s", e)
         
-        return saved_files
+        return parsed_files
     
     def cleanup(self):
         """Cleanup agent and thread resources (Phase 1 pattern)."""
@@ -893,18 +1186,58 @@ class ModuleDevelopmentAgent:
         # It's initialized before parallel generation and cleaned up after
         # No need to cleanup here as it's already done in the finally block
         
-        if self.agent:
-            try:
-                self.agents_client.delete_agent(self.agent.id)
-                logger.info(f"Deleted ModuleDevelopmentAgent: {self.agent.id}")
-            except Exception as e:
-                logger.warning(f"Failed to delete agent: {e}")
-            self.agent = None
+        agent_id = self._release_agent()
+        if agent_id:
+            self._delete_agent(agent_id)
         
-        if self.thread:
-            try:
-                self.agents_client.threads.delete(self.thread.id)
-                logger.info(f"Deleted thread: {self.thread.id}")
-            except Exception as e:
-                logger.warning(f"Failed to delete thread: {e}")
-            self.thread = None
\ No newline at end of file
+        for thread_id in self.thread_ids:
+            self._delete_thread(thread_id)
+        self.thread_ids = []
+    
+    async def cleanup_async(self):
+        """Cleanup agent and thread resources, issuing the deletes concurrently.
+        
+        Same as ``cleanup`` but each delete is a blocking SDK round-trip, so
+        they run in worker threads and are awaited together.
+        """
+        deletes = []
+        agent_id = self._release_agent()
+        if agent_id:
+            deletes.append(asyncio.to_thread(self._delete_agent, agent_id))
+        deletes.extend(
+            asyncio.to_thread(self._delete_thread, thread_id)
+            for thread_id in self.thread_ids
+        )
+        self.thread_ids = []
+        
+        # Failures are logged by the delete helpers
+        await asyncio.gather(*deletes)
+    
+    def _release_agent(self) -> Optional[str]:
+        """Detach the agent, returning its ID if it should be deleted."""
+        if not self.agent:
+            return None
+        agent_id = self.agent.id
+        self.agent = None
+        
+        if self.settings.module_agent_reuse:
+            # Kept for the next run (see MODULE_AGENT_REUSE)
+            logger.info(f"Keeping ModuleDevelopmentAgent for reuse: {agent_id}")
+            return None
+        return agent_id
+    
+    def _delete_agent(self, agent_id: str) -> None:
+        """Delete an agent, logging (not raising) failures."""
+        try:
+            self.agents_client.delete_agent(agent_id)
+            logger.info(f"Deleted ModuleDevelopmentAgent: {agent_id}")
+        except Exception as e:
+            logger.warning(f"Failed to delete agent: {e}")
+    
+    def _delete_thread(self, thread_id: str) -> None:
+        """Delete a thread, logging (not raising) failures."""
+        try:
+            self.agents_client.threads.delete(thread_id)
+            logger.info(f"Deleted thread: {thread_id}")
+        except Exception as e:
+            logger.warning(f"Failed to delete thread: {e}")
\ No newline at end of file
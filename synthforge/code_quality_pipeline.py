@@ -414,9 +414,10 @@ class CodeQualityPipeline:
             temp_path = Path(temp_dir)
             self._save_code(generated_code, temp_path)
             
-            # Stage 2: Initial validation
+            # Stage 2: Initial validation (the CLI subprocesses run in a worker
+            # thread so concurrent pipelines don't block the event loop)
             validator = self.validator_class(temp_path)
-            validation_result = validator.validate()
+            validation_result = await asyncio.to_thread(validator.validate)
             
             logger.info(f"Initial validation: {validation_result.status} - "
                        f"{validation_result.error_count} errors, "
@@ -455,7 +456,7 @@ class CodeQualityPipeline:
                 
                 # Re-save and re-validate
                 self._save_code(generated_code, temp_path)
-                validation_result = validator.validate()
+                validation_result = await asyncio.to_thread(validator.validate)
                 
                 logger.info(f"After fix iteration {iteration}: {validation_result.status} - "
                            f"{validation_result.error_count} errors, "
@@ -483,7 +484,7 @@ class CodeQualityPipeline:
         for filename, content in code.items():
             file_path = directory / filename
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding='utf-8')
+            file_path.write_bytes(content.encode('utf-8'))
     
     async def _get_fixes(self, validation_result: ValidationResult, code_files: Dict[str, str]) -> List[CodeFix]:
         """Get fixes from quality agent."""
@@ -140,6 +140,11 @@ class Settings:
     clarification_threshold: float = field(
         default_factory=lambda: float(os.environ.get("CLARIFICATION_THRESHOLD", "0.7"))
     )
+    # "Review each" auto-confirms resources at or above this confidence
+    # (set above 1.0 to review every resource)
+    auto_confirm_threshold: float = field(
+        default_factory=lambda: float(os.environ.get("AUTO_CONFIRM_THRESHOLD", "0.9"))
+    )
     
     # Detection settings
     detection_confidence_threshold: float = field(
@@ -153,6 +158,45 @@ class Settings:
         default_factory=lambda: float(os.environ.get("MODEL_TEMPERATURE", "0.0"))
     )
     
+    # Filter Agent response cache: identical filter prompts reuse the stored
+    # agent decisions instead of re-running the agent
+    filter_cache_enabled: bool = field(
+        default_factory=lambda: os.environ.get("FILTER_CACHE_ENABLED", "true").lower() == "true"
+    )
+    filter_cache_dir: Path = field(
+        default_factory=lambda: Path(
+            os.environ.get("FILTER_CACHE_DIR", str(Path.home() / ".synthforge" / "filter_cache"))
+        )
+    )
+    
+    # Module Development Agent response cache: identical module prompts reuse
+    # the stored generated code instead of re-running the agent
+    module_cache_enabled: bool = field(
+        default_factory=lambda: os.environ.get("MODULE_CACHE_ENABLED", "true").lower() == "true"
+    )
+    module_cache_dir: Path = field(
+        default_factory=lambda: Path(
+            os.environ.get("MODULE_CACHE_DIR", str(Path.home() / ".synthforge" / "module_cache"))
+        )
+    )
+    # Cached module code older than this is regenerated (0 = never expires)
+    module_cache_ttl_seconds: int = field(
+        default_factory=lambda: int(os.environ.get("MODULE_CACHE_TTL_SECONDS", "604800"))
+    )
+    # Keep the Module Development Agent between runs and reuse it when the
+    # model, instructions and tools are unchanged (skips create_agent)
+    module_agent_reuse: bool = field(
+        default_factory=lambda: os.environ.get("MODULE_AGENT_REUSE", "false").lower() == "true"
+    )
+    # Module generation agent runs in flight at once (bounded to avoid 429 storms)
+    module_max_concurrent_runs: int = field(
+        default_factory=lambda: int(os.environ.get("MODULE_MAX_CONCURRENT_RUNS", "5"))
+    )
+    # Generated modules validated at once (separate from generation runs)
+    module_max_concurrent_validations: int = field(
+        default_factory=lambda: int(os.environ.get("MODULE_MAX_CONCURRENT_VALIDATIONS", "4"))
+    )
+    
     def __post_init__(self):
         """Validate required settings and create directories."""
         if not self.project_endpoint:
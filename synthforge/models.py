@@ -109,6 +109,23 @@ class DetectedIcon(BaseModel):
         elif self.confidence >= 0.5:
             return ResourceConfidence.LOW
         return ResourceConfidence.UNCERTAIN
+    
+    # Display helpers are plain properties, not cached: a cached value would
+    # be stored on the instance and carried over by model_copy(update=...)
+    @property
+    def display_name(self) -> str:
+        """Instance name for display."""
+        return self.name or "Unnamed"
+    
+    @property
+    def display_confidence(self) -> str:
+        """Confidence formatted as a percentage."""
+        return f"{self.confidence:.0%}"
+    
+    @property
+    def display_arm_type(self) -> str:
+        """ARM resource type for display."""
+        return self.arm_resource_type or "Unknown ARM type"
 
 
 class DetectedText(BaseModel):
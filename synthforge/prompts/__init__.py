@@ -120,7 +120,8 @@ def get_response_schema(schema_name: str) -> dict[str, Any]:
     
     Args:
         schema_name: One of 'security_recommendations', 'network_flows',
-                    'vision_detection', 'filter_decisions', 'clarification_response'
+                    'vision_detection', 'filter_decisions', 'clarification_response',
+                    'service_lookup', 'service_suggestions'
     
     Returns:
         JSON schema dictionary
@@ -278,8 +279,9 @@ def get_security_agent_instructions() -> str:
     return get_agent_instructions("security_agent")
 
 
+@lru_cache(maxsize=1)
 def get_interactive_agent_instructions() -> str:
-    """Get Interactive Agent instructions."""
+    """Get Interactive Agent instructions (memoized; read on every agent entry)."""
     return get_agent_instructions("interactive_agent")
 
 
@@ -656,7 +656,7 @@ class ArchitectureWorkflow:
         else:
             logger.info(f"✓ All {len(all_description_components)} description components detected by vision/OCR")
         
-    async def _run_filter(self, detection_result: DetectionResult, description: Optional[Any] = None) -> FilterResult:
+    async def _run_filter(self, detection_result: DetectionResult, description: Optional[ArchitectureDescription] = None) -> FilterResult:
         """Run filter stage with optional description context for enrichment."""
         logger = logging.getLogger(__name__)
         
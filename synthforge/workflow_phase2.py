@@ -650,7 +650,7 @@ class Phase2Workflow:
                 )
                 await self._emit_progress("module_development", f"Generated {dev_result.total_count} module wrappers", 0.85)
             finally:
-                module_dev_agent.cleanup()
+                await module_dev_agent.cleanup_async()
             
             # Stage 5: Deployment Wrappers - Generate deployment orchestration (85-90%)
             # NOTE: Stage 5 progress is handled by the deployment wrapper agent's callback
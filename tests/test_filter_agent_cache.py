@@ -0,0 +1,112 @@
+"""
+Tests for the Filter Agent response cache.
+
+Uses a fake AgentsClient - no Azure resources are needed.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from synthforge.config import get_settings
+from synthforge.models import DetectionResult, DetectedIcon, Position
+import synthforge.agents.filter_agent as filter_agent_module
+from synthforge.agents.filter_agent import FilterAgent
+
+
+RESPONSE_TEXT = (
+    '{"decisions": [{"resource_type": "App Service", "category": "architectural", '
+    '"reasoning": "Deployed per application", "confidence": 0.9}], "summary": "1 architectural"}'
+)
+
+
+class FakeAgentsClient:
+    """Records agent runs and answers every run with RESPONSE_TEXT."""
+
+    def __init__(self):
+        self.runs_created = 0
+        self.threads = SimpleNamespace(create=lambda: SimpleNamespace(id="thread"))
+        self.messages = SimpleNamespace(
+            create=lambda **kwargs: None,
+            get_last_message_text_by_role=lambda **kwargs: SimpleNamespace(
+                text=SimpleNamespace(value=RESPONSE_TEXT)
+            ),
+        )
+        self.runs = SimpleNamespace(create_and_process=self._create_and_process)
+
+    def _create_and_process(self, **kwargs):
+        self.runs_created += 1
+        return SimpleNamespace(status="completed")
+
+
+@pytest.fixture
+def filter_agent(monkeypatch, tmp_path):
+    """FilterAgent wired to a fake client, with an empty cache in tmp_path."""
+    monkeypatch.setenv("PROJECT_ENDPOINT", "https://example.services.ai.azure.com/api/projects/test")
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("FILTER_CACHE_ENABLED", "true")
+    monkeypatch.setenv("FILTER_CACHE_DIR", str(tmp_path / "filter_cache"))
+    get_settings.cache_clear()
+    filter_agent_module._RESPONSE_CACHE.clear()
+
+    agent = FilterAgent()
+    agent._client = FakeAgentsClient()
+    agent._agent_id = "agent"
+    yield agent
+
+    filter_agent_module._RESPONSE_CACHE.clear()
+    get_settings.cache_clear()
+
+
+def _detection_result() -> DetectionResult:
+    return DetectionResult(icons=[
+        DetectedIcon(
+            type="App Service",
+            name="web",
+            position=Position(x=10, y=10),
+            confidence=0.9,
+            arm_resource_type="Microsoft.Web/sites",
+        )
+    ])
+
+
+def test_cache_hit_skips_agent_run(filter_agent):
+    """A repeated filter call is answered from the cache without a run."""
+    first = asyncio.run(filter_agent.filter_resources(_detection_result()))
+    second = asyncio.run(filter_agent.filter_resources(_detection_result()))
+
+    assert filter_agent._client.runs_created == 1
+    assert [icon.name for icon in first.architectural] == ["web"]
+    assert [icon.name for icon in second.architectural] == ["web"]
+    assert len(list(filter_agent.settings.filter_cache_dir.glob("*.json"))) == 1
+
+
+def test_disk_cache_hit_after_memory_cleared(filter_agent):
+    """Entries on disk are reused by a later run (empty in-memory layer)."""
+    asyncio.run(filter_agent.filter_resources(_detection_result()))
+    filter_agent_module._RESPONSE_CACHE.clear()
+
+    result = asyncio.run(filter_agent.filter_resources(_detection_result()))
+
+    assert filter_agent._client.runs_created == 1
+    assert result.summary == "1 architectural"
+
+
+def test_instruction_change_misses_cache(filter_agent, monkeypatch):
+    """Editing the agent instructions invalidates earlier cache entries."""
+    asyncio.run(filter_agent.filter_resources(_detection_result()))
+
+    monkeypatch.setattr(
+        filter_agent_module,
+        "_get_agent_instructions",
+        lambda: "Edited filter agent instructions",
+    )
+    asyncio.run(filter_agent.filter_resources(_detection_result()))
+
+    assert filter_agent._client.runs_created == 2
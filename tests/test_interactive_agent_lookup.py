@@ -0,0 +1,251 @@
+"""
+Tests for the Interactive Agent service lookups and console input.
+
+The agent run is replaced with canned replies - no Azure resources are needed.
+"""
+
+import asyncio
+import builtins
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from synthforge.config import get_settings
+from synthforge.models import DetectedIcon, FilterResult, Position
+from synthforge.agents.interactive_agent import InteractiveAgent, _ConsoleReader
+
+
+class FakeAgentsClient:
+    """Records thread creation/deletion and the threads messages are posted to."""
+
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self.posted = []
+        self.threads = SimpleNamespace(create=self._create_thread, delete=self.deleted.append)
+        self.messages = SimpleNamespace(create=self._create_message)
+
+    def _create_thread(self):
+        self.created.append(f"thread-{len(self.created) + 1}")
+        return SimpleNamespace(id=self.created[-1])
+
+    def _create_message(self, thread_id, role, content):
+        self.posted.append(thread_id)
+
+
+@pytest.fixture
+def settings_env(monkeypatch, tmp_path):
+    """Point settings at tmp_path."""
+    monkeypatch.setenv("PROJECT_ENDPOINT", "https://example.services.ai.azure.com/api/projects/test")
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+    get_settings.cache_clear()
+    yield monkeypatch
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def interactive_agent(settings_env):
+    """InteractiveAgent that looks connected, with lookups answered by ``agent.replies``."""
+    agent = InteractiveAgent()
+    agent._client = object()
+    agent._agent_id = "agent"
+    agent.replies = []
+    agent.lookups = []
+
+    async def run_lookup(schema_name, content):
+        agent.lookups.append(schema_name)
+        return agent.replies.pop(0)
+
+    agent._run_lookup = run_lookup
+    return agent
+
+
+@pytest.fixture
+def lookup_agent(settings_env):
+    """InteractiveAgent on a fake client; each stream returns the next ``agent.outcomes`` entry."""
+    agent = InteractiveAgent()
+    agent._client = FakeAgentsClient()
+    agent._agent_id = "agent"
+    agent.outcomes = []
+
+    def stream_reply(thread_id, response_format):
+        outcome = agent.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    agent._stream_reply = stream_reply
+    return agent
+
+
+@pytest.mark.parametrize("reply", [
+    '{"arm_resource_type": "Microsoft.Web/sites", "category": "Web", "suggestions": null}',
+    '{"arm_resource_type": "Microsoft.Web/sites", "category": "Web", "suggestions": {"service": "x"}}',
+    '{"arm_resource_type": "Microsoft.Web/sites", "category": "Web", "suggestions": '
+    '["Function App", null, {"arm_resource_type": "Microsoft.Web/sites"}, {"service": null}, {"service": 42}]}',
+])
+def test_malformed_suggestions_are_skipped(interactive_agent, reply):
+    """Suggestion entries that do not match the schema are ignored, not raised on."""
+    interactive_agent.replies.append(reply)
+
+    result = asyncio.run(interactive_agent._suggest_all("App Service", count=5))
+
+    assert result["arm_resource_type"] == "Microsoft.Web/sites"
+    assert result["category"] == "Web"
+    assert result["suggestions"] == []
+
+
+def test_valid_suggestions_are_kept_alongside_malformed_ones(interactive_agent):
+    """Well-formed entries survive next to malformed ones and seed the lookup caches."""
+    interactive_agent.replies.append(
+        '```json\n{"arm_resource_type": "Microsoft.Web/sites", "category": "Web", "suggestions": ['
+        '{"service": " Function App ", "arm_resource_type": "Microsoft.Web/sites", "category": "Compute"}, '
+        '{"service": null}]}\n```'
+    )
+
+    result = asyncio.run(interactive_agent._suggest_all("App Service", count=5))
+
+    assert result["suggestions"] == [
+        {"service": "Function App", "arm_resource_type": "Microsoft.Web/sites", "category": "Compute"}
+    ]
+    assert interactive_agent._arm_cache["function app"] == "Microsoft.Web/sites"
+
+
+@pytest.mark.parametrize("reply", [None, "", "no json here", "{not json", "[1, 2]"])
+def test_unusable_reply_returns_empty_result(interactive_agent, reply):
+    """Replies without a JSON object give an empty result instead of an error."""
+    interactive_agent.replies.append(reply)
+
+    result = asyncio.run(interactive_agent._suggest_all("App Service", count=5))
+
+    assert result == {"suggestions": [], "arm_resource_type": None, "category": None}
+
+
+def test_lookup_thread_is_reused_after_a_clean_reply(lookup_agent):
+    """A thread whose run finished cleanly serves the next lookup."""
+    lookup_agent.outcomes += [('{"a": 1}', True), ('{"b": 2}', True)]
+
+    async def scenario():
+        return [
+            await lookup_agent._run_lookup("service_lookup", "first"),
+            await lookup_agent._run_lookup("service_lookup", "second"),
+        ]
+
+    assert asyncio.run(scenario()) == ['{"a": 1}', '{"b": 2}']
+    client = lookup_agent._client
+    assert client.created == ["thread-1"]
+    assert client.posted == ["thread-1", "thread-1"]
+    assert client.deleted == []
+    assert lookup_agent._idle_threads == ["thread-1"]
+
+
+@pytest.mark.parametrize("outcome", [RuntimeError("stream dropped"), ('{"a": 1}', False)])
+def test_lookup_thread_is_retired_after_an_unclean_run(lookup_agent, outcome):
+    """A thread whose run may still be active is deleted, and the next lookup gets a new one."""
+    lookup_agent.outcomes += [outcome, ('{"b": 2}', True)]
+
+    async def scenario():
+        try:
+            await lookup_agent._run_lookup("service_lookup", "first")
+        except RuntimeError:
+            pass
+        return await lookup_agent._run_lookup("service_lookup", "second")
+
+    assert asyncio.run(scenario()) == '{"b": 2}'
+    client = lookup_agent._client
+    assert client.created == ["thread-1", "thread-2"]
+    assert client.posted == ["thread-1", "thread-2"]
+    assert client.deleted == ["thread-1"]
+    assert "thread-1" not in lookup_agent._thread_turns
+    assert lookup_agent._idle_threads == ["thread-2"]
+
+
+def test_cancelled_prompt_hands_its_line_to_the_next_prompt(monkeypatch, capsys):
+    """A prompt cancelled mid-input does not leave a second reader on stdin."""
+    typed = iter(["first answer", "second answer"])
+    line_entered = threading.Event()
+    prompts = []
+
+    def fake_input(prompt):
+        prompts.append(prompt)
+        line_entered.wait()
+        line_entered.clear()
+        return next(typed)
+
+    monkeypatch.setattr(builtins, "input", fake_input)
+    reader = _ConsoleReader()
+
+    async def scenario():
+        abandoned = asyncio.create_task(reader.read("Q1: "))
+        await asyncio.sleep(0.05)
+        abandoned.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned
+
+        answer = asyncio.create_task(reader.read("Q2: "))
+        await asyncio.sleep(0.05)
+        line_entered.set()
+        first = await answer
+
+        answer = asyncio.create_task(reader.read("Q3: "))
+        await asyncio.sleep(0.05)
+        line_entered.set()
+        return first, await answer
+
+    assert asyncio.run(scenario()) == ("first answer", "second answer")
+    # Q2 reused the blocked read (its prompt is printed directly)
+    assert prompts == ["Q1: ", "Q3: "]
+    assert capsys.readouterr().out == "Q2: "
+
+
+def _uncertain_icon(icon_type: str, options: list, x: float) -> DetectedIcon:
+    return DetectedIcon(
+        type=icon_type,
+        name=icon_type,
+        position=Position(x=x, y=10),
+        confidence=0.4,
+        needs_clarification=True,
+        clarification_options=options,
+    )
+
+
+def test_unpicked_prefetches_are_cancelled_before_the_next_icon(interactive_agent):
+    """Option lookups of an answered icon stop before the next icon is asked about."""
+    started, cancelled = [], []
+    cancelled_at_question = []
+
+    async def fetch_suggestions(service_name, key, count):
+        started.append(service_name)
+        try:
+            # The picked options answer quickly, the others would keep running
+            await asyncio.sleep(0.01 if service_name in ("Alpha", "Gamma") else 5)
+        except asyncio.CancelledError:
+            cancelled.append(service_name)
+            raise
+        return {"suggestions": [], "arm_resource_type": f"Microsoft.Test/{service_name}", "category": "Test"}
+
+    async def answer_first_option(question, options):
+        await asyncio.sleep(0.01)
+        cancelled_at_question.append(sorted(cancelled))
+        return options[0]
+
+    interactive_agent._fetch_suggestions = fetch_suggestions
+    interactive_agent.input_handler = answer_first_option
+    filter_result = FilterResult(needs_clarification=[
+        _uncertain_icon("Icon A", ["Alpha", "Beta"], 10),
+        _uncertain_icon("Icon B", ["Gamma", "Delta"], 50),
+    ])
+
+    responses = asyncio.run(interactive_agent.clarify_resources(filter_result))
+
+    assert [response.clarified_type for response in responses] == ["Alpha", "Gamma"]
+    # Only the current icon's options are prefetched; Beta stops before Icon B is asked
+    assert started == ["Alpha", "Beta", "Gamma", "Delta"]
+    assert cancelled_at_question == [[], ["Beta"]]
+    assert sorted(cancelled) == ["Beta", "Delta"]
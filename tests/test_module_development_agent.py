@@ -0,0 +1,408 @@
+"""
+Tests for the Module Development Agent.
+
+Uses a fake AgentsClient - no Azure resources are needed.
+"""
+
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from synthforge.config import get_settings
+from synthforge.code_quality_pipeline import ValidationResult
+import synthforge.agents.module_development_agent as module_development_agent
+from synthforge.agents.module_development_agent import (
+    ModuleDevelopmentAgent,
+    _clean_bicep,
+    _clean_code,
+    _iter_file_sections,
+)
+from synthforge.agents.module_mapping_agent import ModuleMapping
+from synthforge.agents.service_analysis_agent import ServiceRequirement
+
+
+class FakeAgentsClient:
+    """Answers each run with a main.tf + README.md under the prompt's target module path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages = {}
+        self._thread_count = 0
+        self.runs_created = 0
+        self.agents_created = 0
+        self.deleted_agents = []
+        self.deleted_threads = []
+        self.threads = SimpleNamespace(create=self._create_thread, delete=self.deleted_threads.append)
+        self.messages = SimpleNamespace(
+            create=self._create_message,
+            get_last_message_text_by_role=self._last_message,
+        )
+        self.runs = SimpleNamespace(create_and_process=self._create_and_process)
+
+    def create_agent(self, **kwargs):
+        self.agents_created += 1
+        return SimpleNamespace(id=f"agent-{self.agents_created}")
+
+    def get_agent(self, agent_id):
+        return SimpleNamespace(id=agent_id)
+
+    def delete_agent(self, agent_id):
+        self.deleted_agents.append(agent_id)
+
+    def _create_thread(self):
+        with self._lock:
+            self._thread_count += 1
+            return SimpleNamespace(id=f"thread-{self._thread_count}")
+
+    def _create_message(self, thread_id, role, content):
+        self._messages[thread_id] = content
+        return SimpleNamespace(id=f"message-{thread_id}")
+
+    def _create_and_process(self, thread_id, agent_id, **kwargs):
+        with self._lock:
+            self.runs_created += 1
+        return SimpleNamespace(status="completed", incomplete_details=None, last_error=None)
+
+    def _last_message(self, thread_id, role):
+        folder = re.search(r"Target Module Path: (\S+)", self._messages[thread_id]).group(1)
+        code = (
+            f"# FILE: {folder}/main.tf\n```hcl\nresource \"azurerm_resource_group\" \"this\" {{}}\n```\n"
+            f"# FILE: {folder}/README.md\n# {folder}\n"
+        )
+        return SimpleNamespace(text=SimpleNamespace(value=code))
+
+
+class FakeValidationPipeline:
+    """Reports every module with ``status``; ``"error"`` makes the validator raise."""
+
+    quality_agent = None
+
+    def __init__(self, status: str):
+        self.status = status
+
+    async def run(self, generated_code, output_dir):
+        if self.status == "error":
+            raise RuntimeError("validator crashed")
+        return generated_code, ValidationResult(status=self.status)
+
+
+@pytest.fixture
+def settings_env(monkeypatch, tmp_path):
+    """Point settings at tmp_path (module cache off unless a test enables it)."""
+    monkeypatch.setenv("PROJECT_ENDPOINT", "https://example.services.ai.azure.com/api/projects/test")
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("MODULE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("MODULE_CACHE_DIR", str(tmp_path / "module_cache"))
+    monkeypatch.setenv("MODULE_AGENT_REUSE", "false")
+    monkeypatch.setattr(
+        module_development_agent,
+        "create_agent_toolset",
+        lambda **kwargs: SimpleNamespace(tools=[], tool_resources=None),
+    )
+    get_settings.cache_clear()
+    yield monkeypatch
+    get_settings.cache_clear()
+
+
+def _build_agent(client: FakeAgentsClient) -> ModuleDevelopmentAgent:
+    return ModuleDevelopmentAgent(
+        agents_client=client,
+        model_name="test-model",
+        iac_format="terraform",
+        bing_connection_name="bing",
+        enable_validation=False,
+    )
+
+
+def _mapping(resource_name: str, folder_path: str, arm_type: str = "Microsoft.Web/sites") -> ModuleMapping:
+    return ModuleMapping(
+        service_requirement=ServiceRequirement(
+            service_type="App Service",
+            resource_name=resource_name,
+            arm_type=arm_type,
+        ),
+        module_source="Azure/avm-res-web-site/azurerm",
+        module_version="0.1.0",
+        module_documentation="https://registry.terraform.io/modules/Azure/avm-res-web-site/azurerm",
+        required_inputs=["name", "location"],
+        folder_path=folder_path,
+    )
+
+
+def test_mappings_in_different_folders_are_generated_separately(settings_env, tmp_path):
+    """Mappings that only differ by folder each get their own files; same-folder mappings share."""
+    client = FakeAgentsClient()
+    agent = _build_agent(client)
+    output_dir = tmp_path / "iac"
+    mappings = [
+        _mapping("web-frontend", "modules/web-frontend"),
+        _mapping("web-backend", "modules/web-backend"),
+        _mapping("web-frontend-2", "modules/web-frontend"),
+    ]
+
+    result = asyncio.run(agent.generate_modules(mappings, output_dir))
+
+    assert client.runs_created == 2
+    assert [module.module_name for module in result.modules] == [
+        "modules/web-frontend", "modules/web-backend", "modules/web-frontend",
+    ]
+    # Files are written without the leading modules/ segment
+    for module in result.modules:
+        assert module.file_path.parent == output_dir / Path(module.module_name).name
+        assert module.file_path.is_file()
+    assert (output_dir / "web-backend" / "main.tf").read_text(encoding="utf-8") == (
+        'resource "azurerm_resource_group" "this" {}'
+    )
+
+
+@pytest.mark.parametrize("code, expected", [
+    # With and without '#', fences after the path, modules/ and deployment/ prefixes stripped
+    (
+        "Intro text\n# FILE: modules/a/main.tf\nbody a\nFILE: deployment/b/variables.tf ```hcl\nbody b",
+        [("a/main.tf", "body a"), ("b/variables.tf", "body b")],
+    ),
+    # FILE: lines without a known extension stay in the current file
+    (
+        "# FILE: a/main.tf\nline 1\nFILE: notes.txt\nline 2",
+        [("a/main.tf", "line 1\nFILE: notes.txt\nline 2")],
+    ),
+    # Markers with no lines after them are skipped
+    (
+        "# FILE: a/main.tf\n# FILE: b/main.tf\nbody b\n# FILE: c/main.tf",
+        [("b/main.tf", "body b")],
+    ),
+    ("No markers at all", []),
+])
+def test_iter_file_sections(code, expected):
+    """FILE: markers split the response into (path, content) sections."""
+    assert list(_iter_file_sections(code, (".tf", ".md"))) == expected
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("```hcl\n\n  name = var.name\n\n```\n", "  name = var.name"),
+    ("```terraform\nlocals {}\n```", "locals {}"),
+    ("```\nlocals {}\n```", "locals {}"),
+    ("\n\n", ""),
+])
+def test_clean_code_strips_fences_and_blank_lines(content, expected):
+    """Code fences and surrounding blank lines go; indentation stays."""
+    assert _clean_code(content) == expected
+
+
+@pytest.mark.parametrize("code, expected", [
+    # First ```bicep block wins
+    ("Here:\n```bicep\nparam a string\n```\nAnd:\n```bicep\nparam b string\n```", "param a string"),
+    # Unclosed ```bicep block runs to the end
+    ("```bicep\nparam a string\n", "param a string"),
+    # Any fenced block when there is no ```bicep block
+    ("```\nparam a string\n```", "param a string"),
+    # A lone fence is not a block
+    ("```param a string", "```param a string"),
+])
+def test_clean_bicep_extracts_first_block(code, expected):
+    """Bicep code is taken from the first fenced block."""
+    assert _clean_bicep(code) == expected
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("```markdown\n# Module\n\nUsage\n```", "# Module\n\nUsage"),
+    ("```md  \n\n# Module\n```\n\n", "# Module"),
+    ("```\n# Module\n```", "# Module"),
+    ("  # Module\n\n```hcl\nmodule {}\n```\nMore text\n", "# Module\n\n```hcl\nmodule {}\n```\nMore text"),
+])
+def test_clean_markdown_content_strips_wrapping_fences_only(settings_env, content, expected):
+    """Only fences wrapping the whole README are removed, not code blocks inside it."""
+    agent = _build_agent(FakeAgentsClient())
+    assert agent._clean_markdown_content(content) == expected
+
+
+@pytest.mark.parametrize("code, expected", [
+    # Prose braces and objects without "files" are skipped
+    (
+        'Result {like this} {"note": "x"}\n{"files": {"main.bicep": "param a string"}}',
+        {"main.bicep": "param a string"},
+    ),
+    ('{"files": {"main.bicep": "param a', {}),
+    ('{"files": {"main.bicep": 1}}', {}),
+    ('{"files": "main.bicep"}', {}),
+    ('The "files" key is missing {"main.bicep": "param a string"}', {}),
+])
+def test_parse_bicep_json_response(settings_env, tmp_path, code, expected):
+    """Only a well-formed "files" object of text contents is used; anything else parses to nothing."""
+    agent = _build_agent(FakeAgentsClient())
+    parsed = agent._parse_bicep_json_response(code, tmp_path)
+    assert parsed == {tmp_path / name: content for name, content in expected.items()}
+
+
+def test_terraform_response_without_markers_falls_back_to_default_module(settings_env, tmp_path):
+    """A response without FILE: markers is saved as modules/default/main.tf."""
+    agent = _build_agent(FakeAgentsClient())
+    code = 'resource "azurerm_resource_group" "this" {}'
+    assert agent._parse_terraform_files(code, tmp_path) == {
+        tmp_path / "modules" / "default" / "main.tf": code,
+    }
+
+
+def test_bicep_files_empty_after_cleaning_are_skipped(settings_env, tmp_path):
+    """Bicep sections with nothing left after cleaning are not written."""
+    agent = _build_agent(FakeAgentsClient())
+    code = (
+        "# FILE: modules/app/main.bicep\n```bicep\n```\n"
+        "FILE: modules/app/main.json\n```\n{}\n```\n"
+    )
+    assert agent._parse_bicep_files(code, tmp_path) == {tmp_path / "app" / "main.json": "{}"}
+
+
+@pytest.fixture
+def module_cache_env(settings_env):
+    """settings_env with the module cache turned on."""
+    settings_env.setenv("MODULE_CACHE_ENABLED", "true")
+    get_settings.cache_clear()
+    return settings_env
+
+
+def _generate(client: FakeAgentsClient, output_dir: Path, validation_status: Optional[str] = None) -> ModuleDevelopmentAgent:
+    agent = _build_agent(client)
+    if validation_status:
+        agent.enable_validation = True
+        agent.validation_pipeline = FakeValidationPipeline(validation_status)
+    asyncio.run(agent.generate_modules([_mapping("web", "modules/web")], output_dir))
+    return agent
+
+
+def test_module_cache_stores_only_validated_code(module_cache_env, tmp_path):
+    """Code is cached once it passes validation and is then reused without a run."""
+    client = FakeAgentsClient()
+    cache_dir = tmp_path / "module_cache"
+
+    _generate(client, tmp_path / "iac", "error")
+    assert list(cache_dir.glob("*.json")) == []
+
+    _generate(client, tmp_path / "iac", "pass")
+    assert len(list(cache_dir.glob("*.json"))) == 1
+    assert client.runs_created == 2
+
+    _generate(client, tmp_path / "iac", "pass")
+    assert client.runs_created == 2
+
+
+def test_cached_code_that_fails_validation_is_discarded(module_cache_env, tmp_path):
+    """A cache hit that no longer validates is dropped so the next run regenerates."""
+    client = FakeAgentsClient()
+    cache_dir = tmp_path / "module_cache"
+    _generate(client, tmp_path / "iac", "pass")
+
+    _generate(client, tmp_path / "iac", "error")
+
+    assert client.runs_created == 1
+    assert list(cache_dir.glob("*.json")) == []
+
+
+def test_instruction_change_misses_module_cache(module_cache_env, tmp_path):
+    """Editing the agent instructions invalidates earlier cache entries."""
+    client = FakeAgentsClient()
+    _generate(client, tmp_path / "iac")
+
+    module_cache_env.setattr(
+        module_development_agent,
+        "get_module_development_agent_instructions",
+        lambda iac_format: "Edited module development instructions",
+    )
+    _generate(client, tmp_path / "iac")
+
+    assert client.runs_created == 2
+
+
+def test_expired_module_cache_entries_are_regenerated(module_cache_env, tmp_path):
+    """Entries older than MODULE_CACHE_TTL_SECONDS are treated as misses."""
+    module_cache_env.setenv("MODULE_CACHE_TTL_SECONDS", "60")
+    get_settings.cache_clear()
+    client = FakeAgentsClient()
+    _generate(client, tmp_path / "iac")
+
+    (cache_file,) = (tmp_path / "module_cache").glob("*.json")
+    entry = json.loads(cache_file.read_text(encoding="utf-8"))
+    entry["created"] = time.time() - 120
+    cache_file.write_text(json.dumps(entry), encoding="utf-8")
+    _generate(client, tmp_path / "iac")
+
+    assert client.runs_created == 2
+
+
+@pytest.fixture
+def agent_reuse_env(settings_env):
+    """settings_env with MODULE_AGENT_REUSE turned on."""
+    settings_env.setenv("MODULE_AGENT_REUSE", "true")
+    get_settings.cache_clear()
+    return settings_env
+
+
+def test_agent_is_kept_and_reused_by_the_next_run(agent_reuse_env):
+    """cleanup() keeps the agent and the next ModuleDevelopmentAgent fetches it."""
+    client = FakeAgentsClient()
+    first = _build_agent(client)
+    first.cleanup()
+
+    second = _build_agent(client)
+
+    assert client.agents_created == 1
+    assert client.deleted_agents == []
+    assert second.agent.id == "agent-1"
+
+
+def test_unavailable_kept_agent_is_replaced(agent_reuse_env):
+    """A kept agent that can no longer be fetched is replaced by a new one."""
+    client = FakeAgentsClient()
+    _build_agent(client).cleanup()
+
+    def get_agent(agent_id):
+        raise RuntimeError("agent not found")
+
+    client.get_agent = get_agent
+    second = _build_agent(client)
+
+    assert client.agents_created == 2
+    assert second.agent.id == "agent-2"
+
+
+def test_instruction_change_creates_a_new_agent(agent_reuse_env):
+    """A kept agent is only reused for the same instructions."""
+    client = FakeAgentsClient()
+    _build_agent(client).cleanup()
+
+    agent_reuse_env.setattr(
+        module_development_agent,
+        "get_module_development_agent_instructions",
+        lambda iac_format: "Edited module development instructions",
+    )
+    _build_agent(client)
+
+    assert client.agents_created == 2
+
+
+def test_cleanup_async_deletes_agent_and_threads(settings_env, tmp_path):
+    """cleanup_async deletes the agent and every run thread."""
+    client = FakeAgentsClient()
+    agent = _build_agent(client)
+    asyncio.run(agent.generate_modules(
+        [_mapping("web-frontend", "modules/web-frontend"), _mapping("web-backend", "modules/web-backend")],
+        tmp_path / "iac",
+    ))
+
+    asyncio.run(agent.cleanup_async())
+
+    assert client.deleted_agents == ["agent-1"]
+    assert sorted(client.deleted_threads) == ["thread-1", "thread-2"]
+    assert agent.agent is None
+    assert agent.thread_ids == []